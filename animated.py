@@ -0,0 +1,108 @@
+# Animated mode for the notebook's participation map.
+#
+# With IMO_ANIMATED=1 the map page stops rendering a figure per slider
+# change.  Every yearly frame is built up front, in one vectorized pass over
+# the results, and shipped as Plotly animation frames, so scrubbing or
+# playing through the years runs in the browser without any callback.
+#
+# The map sends its country list once, in the base trace (the map geometry is
+# plotly.js's own and never travels with the figure); a frame only carries
+# the year's participation flags as a float32 typed array.  Frames hold the
+# full row of flags rather than the countries that changed since the
+# previous year: the slider jumps straight to any year, and Plotly applies a
+# frame by replacing the trace's z, so every frame must stand alone.  That
+# costs ~1.1 KB per frame, ~73 KB of the ~92 KB figure for 65 years, where
+# deltas would average ~7 countries a year.
+#
+# The figure is built once per data generation (see imo_data.reload).
+import functools
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+import imo_data
+
+ENABLED = os.environ.get('IMO_ANIMATED', '0') == '1'
+
+# Milliseconds per frame when playing
+FRAME_DURATION = 300
+
+
+# Year slider plus play/pause buttons driving the frames named by `years`
+def animation_controls(years, active):
+    def animate(frames, duration):
+        return [frames, {'mode': 'immediate', 'frame': {'duration': duration, 'redraw': True},
+                         'transition': {'duration': 0}}]
+
+    return {
+        'sliders': [{
+            'active': active,
+            'currentvalue': {'prefix': 'Year: '},
+            'pad': {'t': 50},
+            'steps': [{'label': str(year), 'method': 'animate', 'args': animate([str(year)], 0)}
+                      for year in years],
+        }],
+        'updatemenus': [{
+            'type': 'buttons',
+            'direction': 'left',
+            'x': 0, 'y': 0, 'xanchor': 'right', 'yanchor': 'top',
+            'pad': {'t': 60, 'r': 10},
+            'buttons': [
+                {'label': 'Play', 'method': 'animate', 'args': animate(None, FRAME_DURATION)},
+                {'label': 'Pause', 'method': 'animate', 'args': animate([None], 0)},
+            ],
+        }],
+    }
+
+
+# Country and year codes of the results rows, plus the sorted labels
+def _codes(results_df):
+    countries, country_codes = np.unique(results_df['country'].astype(str).to_numpy(), return_inverse=True)
+    years, year_codes = np.unique(results_df['year'].to_numpy(), return_inverse=True)
+    return countries, country_codes, years, year_codes
+
+
+# ---------------------------------------------------------------------------
+# Participation map
+# ---------------------------------------------------------------------------
+
+def participation_map_figure():
+    return _participation_map_figure(imo_data.generation())
+
+
+@functools.lru_cache(maxsize=1)
+def _participation_map_figure(generation):
+    countries, country_codes, years, year_codes = _codes(imo_data.get('results'))
+
+    # year x country participation, NaN (not drawn) where absent
+    taking_part = np.full((len(years), len(countries)), np.nan, dtype='float32')
+    taking_part[year_codes, country_codes] = 1
+
+    def title(year):
+        return f'Countries Participating in {year}'
+
+    latest = len(years) - 1
+    fig = go.Figure(
+        go.Choropleth(
+            locations=countries,
+            locationmode='country names',
+            z=taking_part[latest],
+            colorscale=[[0, 'blue'], [1, 'blue']],
+            showscale=False,
+            hovertemplate='%{location}<extra></extra>',
+        ),
+        frames=[
+            go.Frame(name=str(year), data=[go.Choropleth(z=taking_part[i])], traces=[0],
+                     layout={'title': {'text': title(year)}})
+            for i, year in enumerate(years)
+        ],
+    )
+    fig.update_layout(
+        title=title(years[latest]),
+        geo={'scope': 'world'},
+        height=800,
+        width=1200,
+        **animation_controls(years, latest)
+    )
+    return fig.to_dict()
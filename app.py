@@ -0,0 +1,34 @@
+# Every dashboard as one multi-page Dash app, e.g. /gdp, /gender, /medals.
+#
+# The pages live in pages/ and share the process-wide data layer (imo_data),
+# so each dataset is parsed once no matter how many pages read it.  Page
+# layouts are built when a page is opened and read their data on first use,
+# so a page nobody visits never loads its data.  Component ids are
+# namespaced per page, so pages with the same controls do not collide.
+import dash
+from dash import dcc, html
+
+import hot_reload
+import metrics
+
+
+def create_app():
+    # Page layouts are not all in the initial layout, and building them just
+    # to validate callbacks would load every page's data up front
+    app = dash.Dash(__name__, use_pages=True, suppress_callback_exceptions=True)
+
+    app.layout = html.Div([
+        html.Nav([
+            dcc.Link(page['name'], href=page['relative_path'], style={'marginRight': '20px'})
+            for page in dash.page_registry.values()
+        ], style={'padding': '10px 20px', 'borderBottom': '1px solid #ddd', 'fontFamily': 'Arial'}),
+        dash.page_container
+    ])
+    metrics.instrument(app)
+    return app
+
+
+if __name__ == '__main__':
+    if hot_reload.ENABLED:
+        hot_reload.start()
+    create_app().run(debug=True)
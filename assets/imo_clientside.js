@@ -0,0 +1,241 @@
+// Browser-side callbacks for the GDP dashboards' client-side mode
+// (IMO_CLIENTSIDE=1, see clientside.py).  They mirror update_country_dropdown
+// and update_graphs, reading rows from the dcc.Store the server sent once.
+
+(function () {
+    // Year -> row positions and country -> row positions, built once per store
+    var indexes = new WeakMap();
+
+    function indexFor(data) {
+        var index = indexes.get(data);
+        if (index) {
+            return index;
+        }
+        index = {byYear: {}, byCountry: {}};
+        for (var i = 0; i < data.year.length; i++) {
+            (index.byYear[data.year[i]] = index.byYear[data.year[i]] || []).push(i);
+            (index.byCountry[data.country[i]] = index.byCountry[data.country[i]] || []).push(i);
+        }
+        // Country rows in year order for the time series
+        Object.keys(index.byCountry).forEach(function (country) {
+            index.byCountry[country].sort(function (a, b) {
+                return data.year[a] - data.year[b];
+            });
+        });
+        indexes.set(data, index);
+        return index;
+    }
+
+    function pick(values, rows) {
+        return rows.map(function (i) { return values[i]; });
+    }
+
+    function component(type, props) {
+        return {type: type, namespace: 'dash_html_components', props: props};
+    }
+
+    function statLine(label, value) {
+        return component('P', {children: [label, component('Strong', {children: value})]});
+    }
+
+    // Points along the year's trendline, as trendline_points() in imo_data.py
+    function trendlinePoints(fit, points) {
+        var x = [], y = [];
+        if (fit.slope === null) {
+            return {x: x, y: y};
+        }
+        if (fit.log_x) {
+            x = [fit.x_min, fit.x_max];
+            y = x.map(function (v) { return fit.intercept + fit.slope * Math.log10(v); });
+        } else {
+            var ratio = Math.pow(fit.x_max / fit.x_min, 1 / (points - 1));
+            for (var i = 0; i < points; i++) {
+                x.push(fit.x_min * Math.pow(ratio, i));
+            }
+            y = x.map(function (v) { return fit.intercept + fit.slope * v; });
+        }
+        return {x: x, y: y};
+    }
+
+    function scatterFigure(data, config, year, rows, row, country) {
+        var medals = pick(data.medals, rows);
+        var maxMedals = Math.max.apply(null, medals.concat([1]));
+        var fit = data.trendlines[String(year)];
+        var line = trendlinePoints(fit, 50);
+        var traces = [
+            {
+                type: 'scatter',
+                mode: 'markers',
+                x: pick(data.x, rows),
+                y: medals,
+                text: pick(data.country, rows),
+                marker: {
+                    size: medals,
+                    sizemode: 'area',
+                    // Same scaling as plotly express' default size_max=20
+                    sizeref: 2 * maxMedals / (20 * 20),
+                    color: medals,
+                    colorscale: 'Plasma',
+                    colorbar: {title: {text: 'Total Medals'}}
+                },
+                showlegend: false,
+                hovertemplate: 'Country=%{text}<br>' + config.x_label + '=%{x}<br>' +
+                    'Total Medals=%{y}<extra></extra>'
+            },
+            {
+                type: 'scatter',
+                mode: 'lines',
+                x: line.x,
+                y: line.y,
+                line: {color: '#636efa'},
+                showlegend: false,
+                hovertemplate: '<b>OLS trendline</b><br>R<sup>2</sup>=' +
+                    (fit.r2 === null ? 'n/a' : fit.r2.toFixed(6)) + '<extra></extra>'
+            }
+        ];
+        if (row !== undefined) {
+            traces.push({
+                type: 'scatter',
+                mode: 'markers+text',
+                x: [data.x[row]],
+                y: [data.medals[row]],
+                marker: {size: 20, color: '#e74c3c', symbol: 'star'},
+                text: [country],
+                textposition: 'top center',
+                name: country,
+                showlegend: false,
+                hovertemplate: '<b>%{text}</b><br>' + config.hover_x + ': $%{x:,.0f}<br>' +
+                    'Medals: %{y}<br><extra></extra>'
+            });
+        }
+        return {
+            data: traces,
+            layout: {
+                title: {text: config.scatter_title + ' (' + year + ')', x: 0.5},
+                xaxis: {type: 'log', title: {text: config.x_label}},
+                yaxis: {title: {text: 'Total Medals'}},
+                plot_bgcolor: 'rgba(240,240,240,0.2)',
+                paper_bgcolor: 'white',
+                hoverlabel: {bgcolor: 'white'},
+                hovermode: 'closest',
+                legend: {yanchor: 'top', y: 1.1, xanchor: 'left', x: 0, orientation: 'h'},
+                margin: {t: 150}
+            }
+        };
+    }
+
+    function timeSeriesFigure(data, config, countryRows, country) {
+        var years = pick(data.year, countryRows);
+        return {
+            data: [
+                {
+                    type: 'scatter',
+                    mode: 'lines+markers',
+                    x: years,
+                    y: pick(data.x, countryRows).map(function (v) { return v / config.series_scale; }),
+                    name: config.series_name,
+                    line: {color: '#3498db'},
+                    hovertemplate: config.series_hover,
+                    xaxis: 'x',
+                    yaxis: 'y'
+                },
+                {
+                    type: 'scatter',
+                    mode: 'lines+markers',
+                    x: years,
+                    y: pick(data.medals, countryRows),
+                    name: 'Medals',
+                    line: {color: '#e74c3c'},
+                    hovertemplate: 'Year: %{x}<br>Medals: %{y}<extra></extra>',
+                    xaxis: 'x2',
+                    yaxis: 'y2'
+                }
+            ],
+            layout: {
+                height: 500,
+                showlegend: false,
+                plot_bgcolor: 'rgba(240,240,240,0.2)',
+                paper_bgcolor: 'white',
+                title: {text: country + ' Historical Trends', x: 0.5},
+                // Two stacked rows, as make_subplots(rows=2, cols=1)
+                xaxis: {anchor: 'y', domain: [0, 1]},
+                yaxis: {anchor: 'x', domain: [0.575, 1]},
+                xaxis2: {anchor: 'y2', domain: [0, 1]},
+                yaxis2: {anchor: 'x2', domain: [0, 0.425]},
+                annotations: [
+                    {text: config.series_title, x: 0.5, y: 1, xref: 'paper', yref: 'paper',
+                     xanchor: 'center', yanchor: 'bottom', showarrow: false, font: {size: 16}},
+                    {text: 'Medals Over Time', x: 0.5, y: 0.425, xref: 'paper', yref: 'paper',
+                     xanchor: 'center', yanchor: 'bottom', showarrow: false, font: {size: 16}}
+                ]
+            }
+        };
+    }
+
+    function statsCard(data, config, row, countryRows) {
+        var bestRow = countryRows[0];
+        var total = 0;
+        countryRows.forEach(function (i) {
+            total += data.medals[i];
+            if (data.medals[i] > data.medals[bestRow]) {
+                bestRow = i;
+            }
+        });
+        var participants = data.participants[row];
+        return component('Div', {children: [
+            component('H4', {
+                children: 'Country Performance',
+                style: {marginBottom: '15px', color: '#2c3e50'}
+            }),
+            component('Div', {
+                children: [
+                    statLine(config.rank_label, data.x_rank[row] + '/' + participants),
+                    statLine('Current Medals Rank: ', data.medals_rank[row] + '/' + participants),
+                    statLine('Historical Best Year: ', String(data.year[bestRow])),
+                    statLine('Total Historical Medals: ', total.toFixed(0))
+                ],
+                style: {backgroundColor: 'white', padding: '15px', borderRadius: '5px'}
+            })
+        ]});
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        imo: {
+            countryOptions: function (year, data) {
+                var rows = indexFor(data).byYear[year] || [];
+                var seen = {};
+                var options = [];
+                rows.forEach(function (i) {
+                    var country = data.country[i];
+                    if (!seen[country]) {
+                        seen[country] = true;
+                        options.push({label: country, value: country});
+                    }
+                });
+                return [options, options.length ? options[0].value : null];
+            },
+
+            graphs: function (year, country, data) {
+                var index = indexFor(data);
+                var config = data.config;
+                var rows = index.byYear[year] || [];
+                var countryRows = index.byCountry[country] || [];
+                var row;
+                rows.forEach(function (i) {
+                    if (data.country[i] === country) {
+                        row = i;
+                    }
+                });
+                if (row === undefined) {
+                    var noUpdate = window.dash_clientside.no_update;
+                    return [noUpdate, noUpdate, noUpdate];
+                }
+                return [
+                    scatterFigure(data, config, year, rows, row, country),
+                    timeSeriesFigure(data, config, countryRows, country),
+                    statsCard(data, config, row, countryRows)
+                ];
+            }
+        }
+    });
+})();
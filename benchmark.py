@@ -0,0 +1,376 @@
+# Benchmark suite for the data layer and every Dash callback.
+#
+#     python benchmark.py                          # run, write benchmark-results.json
+#     python benchmark.py --baseline base.json     # also fail on regressions
+#     python benchmark.py --quick --output base.json
+#     IMO_DATA_DIR=synthetic_data python benchmark.py --quick   # see generate_synthetic.py
+#
+# Datasets: every dataset registered in imo_data is built on its own, with
+# the datasets it reads already loaded, so CSV parsing, melt/merge and the
+# derived indexes are timed separately; cached datasets are also timed when
+# read back from the on-disk cache.
+#
+# Callbacks: every callback of the multi-page app (app.py) is driven through
+# Flask's test client, exactly as the browser calls /_dash-update-component,
+# over all valid inputs (every year and every country in it for the GDP
+# dashboards, every view of the gender dashboard, ...).  Latency is reported
+# as p50/p95/max, the response body size as the serialized figure size, the
+# request body size as what the browser uploads (inputs and state), and the
+# peak Python allocation per call is measured with tracemalloc in a
+# separate pass over a sample of the inputs, so tracing does not skew the
+# timings.
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import dash
+import numpy as np
+import pandas as pd
+import plotly
+
+import animated
+import figure_cache
+import frame_cache
+import imo_data
+
+DEFAULT_OUTPUT = 'benchmark-results.json'
+
+# Allowed relative growth before a metric counts as a regression, and the
+# absolute growth below which differences are treated as noise
+THRESHOLDS = {'ms': 0.25, 'bytes': 0.05, 'peak_kb': 0.20}
+NOISE_FLOOR = {'ms': 1.0, 'bytes': 256, 'peak_kb': 64}
+
+# Inputs traced for peak memory per callback
+MEMORY_SAMPLE = 25
+
+
+def percentile_summary(latencies_ms):
+    latencies = np.asarray(latencies_ms)
+    return {
+        'calls': int(len(latencies)),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'max_ms': float(latencies.max()),
+    }
+
+
+def traced_peak_kb(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+# ---------------------------------------------------------------------------
+# Datasets
+# ---------------------------------------------------------------------------
+
+# Cache reads are timed against a throwaway cache directory; the cache
+# settings are restored afterwards
+def bench_datasets(repeat):
+    cache_dir, cache_enabled = frame_cache.CACHE_DIR, frame_cache.CACHE_ENABLED
+    with tempfile.TemporaryDirectory(prefix='imo-benchmark-') as temp_dir:
+        frame_cache.CACHE_DIR = temp_dir
+        try:
+            return _bench_datasets(repeat)
+        finally:
+            frame_cache.CACHE_DIR, frame_cache.CACHE_ENABLED = cache_dir, cache_enabled
+
+
+def _bench_datasets(repeat):
+    results = {}
+    imo_data.clear()
+    imo_data.preload()
+
+    for name in imo_data.names():
+        def build():
+            imo_data.clear(name)
+            imo_data.get(name)
+
+        # Built from the already loaded datasets it depends on
+        frame_cache.CACHE_ENABLED = False
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build()
+            timings.append((time.perf_counter() - start) * 1000)
+        entry = {'build_ms': min(timings), 'peak_kb': traced_peak_kb(build)}
+
+        frame = imo_data.get(name)
+        if isinstance(frame, pd.DataFrame):
+            entry['rows'] = len(frame)
+            entry['bytes'] = imo_data.frame_bytes(frame)
+
+        if imo_data.is_cached(name):
+            frame_cache.CACHE_ENABLED = True
+            build()  # write the cache entry
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                build()
+                timings.append((time.perf_counter() - start) * 1000)
+            entry['cache_read_ms'] = min(timings)
+
+        results[name] = entry
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Callbacks
+# ---------------------------------------------------------------------------
+
+def output_spec(outputs):
+    if len(outputs) == 1:
+        return '{}.{}'.format(*outputs[0]), {'id': outputs[0][0], 'property': outputs[0][1]}
+    return ('..' + '...'.join('{}.{}'.format(*output) for output in outputs) + '..',
+            [{'id': component, 'property': prop} for component, prop in outputs])
+
+
+# One callback request: `inputs` and `state` are lists of (id, property,
+# value) in the callback's order; `triggered` is the id, or list of ids, the
+# browser reports as changed (default: the first input)
+def callback_request(outputs, inputs, triggered=None, state=()):
+    output, outputs_body = output_spec(outputs)
+    triggered = triggered or inputs[0][0]
+    if isinstance(triggered, str):
+        triggered = [triggered]
+    return {
+        'output': output,
+        'outputs': outputs_body,
+        'inputs': [{'id': component, 'property': prop, 'value': value}
+                   for component, prop, value in inputs],
+        'changedPropIds': [f'{component}.{prop}' for component, prop, _ in inputs if component in triggered],
+        'state': [{'id': component, 'property': prop, 'value': value}
+                  for component, prop, value in state],
+    }
+
+
+def gdp_requests(module):
+    index = module.index()
+    dropdown_outputs = [(module.COUNTRY_DROPDOWN, 'options'), (module.COUNTRY_DROPDOWN, 'value')]
+    graph_outputs = [(module.SCATTER_PLOT, 'figure'), (module.COUNTRY_DETAILS, 'figure'),
+                     (module.COUNTRY_STATS, 'children')]
+
+    graph_outputs.append((module.SHOWN_YEAR, 'data'))
+
+    def graph_request(year, country, triggered, shown):
+        return callback_request(graph_outputs,
+                                [(module.YEAR_SLIDER, 'value', year), (module.COUNTRY_DROPDOWN, 'value', country)],
+                                triggered, [(module.SHOWN_YEAR, 'data', shown)])
+
+    # The requests dash-renderer sends, in order.  Initial load (and
+    # navigation to the page): update_graphs runs after the chained dropdown
+    # callback, with only the dropdown reported as changed and no scatter
+    # drawn yet, so no shown year stored.
+    latest = int(index.years()[-1])
+    dropdown, graphs = [], [graph_request(latest, index.countries(latest)[0], module.COUNTRY_DROPDOWN, None)]
+    shown = latest
+    for year in index.years():
+        year = int(year)
+        countries = index.countries(year)
+        # A slider move: the dropdown callback runs first and sets the first
+        # country, then update_graphs sees both inputs changed while the
+        # browser still shows the previous year
+        dropdown.append(callback_request(dropdown_outputs, [(module.YEAR_SLIDER, 'value', year)]))
+        graphs.append(graph_request(year, countries[0], [module.YEAR_SLIDER, module.COUNTRY_DROPDOWN], shown))
+        # Then the user walks the dropdown over the year's other countries
+        shown = year
+        for country in countries[1:]:
+            graphs.append(graph_request(year, country, module.COUNTRY_DROPDOWN, shown))
+    return {
+        f'{module.__name__}.update_country_dropdown': dropdown,
+        f'{module.__name__}.update_graphs': graphs,
+    }
+
+
+def all_requests():
+    import contestant_stats
+    import contestants
+    import gdp
+    import gdp_per_capita
+    import gender
+
+    requests = {}
+    if not gdp.clientside.ENABLED:
+        requests.update(gdp_requests(gdp))
+        requests.update(gdp_requests(gdp_per_capita))
+
+    requests['gender.update_graph'] = [
+        callback_request([(gender.MAIN_GRAPH, 'figure')], [(gender.VIZ_TYPE, 'value', view)])
+        for view in gender.VIEWS
+    ]
+
+    table_outputs = [(contestants.TABLE, 'data'), (contestants.TABLE, 'page_count'),
+                     (contestants.TABLE, 'page_current'), (contestants.COUNT, 'children')]
+    queries = [('', []), ('{country} contains kor', []), ('{total} >= 30', [{'column_id': 'total', 'direction': 'desc'}]),
+               ('', [{'column_id': 'contestant', 'direction': 'asc'}])]
+    years = ['all'] + contestants.contestant_arrays().years()
+    requests['contestants.update_table'] = [
+        callback_request(table_outputs, [
+            (contestants.YEAR_DROPDOWN, 'value', year),
+            (contestants.TABLE, 'page_current', 0),
+            (contestants.TABLE, 'page_size', contestants.PAGE_SIZE),
+            (contestants.TABLE, 'filter_query', filter_query),
+            (contestants.TABLE, 'sort_by', sort_by),
+        ])
+        for year in years for filter_query, sort_by in queries
+    ]
+
+    requests['contestant_stats.update_year'] = [
+        callback_request([(contestant_stats.DISTRIBUTION_GRAPH, 'figure'), (contestant_stats.SOLVE_RATE_GRAPH, 'figure'),
+                          (contestant_stats.RANK_TABLE, 'data')],
+                         [(contestant_stats.YEAR_DROPDOWN, 'value', year)])
+        for year in years
+    ]
+
+    results = imo_data.get('results')
+    if not animated.ENABLED:
+        requests['pages.participation_map.update_map'] = [
+            callback_request([('participation-map-country-map', 'figure')],
+                             [('participation-map-year-slider', 'value', int(year))])
+            for year in sorted(results['year'].unique())
+        ]
+    for callback, output in (('update_graph', 'medals-medal-chart'),
+                             ('update_medal_points_chart', 'medals-medal-points-chart')):
+        requests[f'pages.medals.{callback}'] = [
+            callback_request([(output, 'figure')], [('medals-country-dropdown', 'value', country)])
+            for country in sorted(results['country'].unique())
+        ]
+    return requests
+
+
+def bench_callbacks(limit=None):
+    import app as app_module
+
+    app = app_module.create_app()
+    client = app.server.test_client()
+    client.get('/')
+
+    def post(body):
+        response = client.post('/_dash-update-component', json=body)
+        if response.status_code not in (200, 204):
+            raise RuntimeError(f"{body['output']} failed with {response.status_code}: {response.data[:500]}")
+        return len(response.data)
+
+    results = {}
+    for name, bodies in all_requests().items():
+        if limit:
+            bodies = bodies[:limit]
+        figure_cache.clear()
+
+        latencies, sizes = [], []
+        # Uploaded bytes, serialized compactly like JSON.stringify in the browser
+        request_sizes = [len(json.dumps(body, separators=(',', ':'))) for body in bodies]
+        for body in bodies:
+            start = time.perf_counter()
+            sizes.append(post(body))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        figure_cache.clear()
+        step = max(1, len(bodies) // MEMORY_SAMPLE)
+        peak = max(traced_peak_kb(lambda: post(body)) for body in bodies[::step])
+
+        results[name] = dict(
+            percentile_summary(latencies),
+            mean_bytes=float(np.mean(sizes)),
+            max_bytes=int(max(sizes)),
+            mean_request_bytes=float(np.mean(request_sizes)),
+            max_request_bytes=int(max(request_sizes)),
+            peak_kb=peak,
+        )
+        print(f"{name:48} {results[name]['calls']:6} calls  p50 {results[name]['p50_ms']:8.2f} ms  "
+              f"p95 {results[name]['p95_ms']:8.2f} ms  {results[name]['mean_bytes']:10,.0f} B  "
+              f"{results[name]['mean_request_bytes']:8,.0f} B up", file=sys.stderr)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+def metric_kind(metric):
+    if metric.endswith('_ms'):
+        return 'ms'
+    if metric.endswith('bytes'):
+        return 'bytes'
+    if metric == 'peak_kb':
+        return 'peak_kb'
+    return None
+
+
+# Regressions of `current` against `baseline` as (section, name, metric, old, new)
+def compare(baseline, current, thresholds=THRESHOLDS):
+    regressions = []
+    for section in ('datasets', 'callbacks'):
+        for name, metrics in current.get(section, {}).items():
+            old_metrics = baseline.get(section, {}).get(name)
+            if old_metrics is None:
+                continue
+            for metric, new in metrics.items():
+                kind = metric_kind(metric)
+                old = old_metrics.get(metric)
+                if kind is None or old is None:
+                    continue
+                if new > old * (1 + thresholds[kind]) and new - old > NOISE_FLOOR[kind]:
+                    regressions.append((section, name, metric, old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the data layer and every Dash callback.')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the results JSON')
+    parser.add_argument('--baseline', help='results JSON to compare against; exit 1 on regressions')
+    parser.add_argument('--repeat', type=int, default=3, help='builds per dataset (the best is kept)')
+    parser.add_argument('--quick', action='store_true', help='only the first 50 inputs per callback')
+    parser.add_argument('--skip-datasets', action='store_true')
+    parser.add_argument('--skip-callbacks', action='store_true')
+    for kind, default in THRESHOLDS.items():
+        parser.add_argument(f'--{kind.replace("_", "-")}-threshold', type=float, default=default,
+                            help=f'allowed relative growth of {kind} metrics (default {default})')
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'dash': dash.__version__,
+            'plotly': plotly.__version__,
+            'cpus': os.cpu_count(),
+            'quick': args.quick,
+            # Compare runs over the same data only (IMO_DATA_DIR)
+            'data_dir': imo_data.DATA_DIR,
+        },
+    }
+    if not args.skip_datasets:
+        report['datasets'] = bench_datasets(args.repeat)
+    if not args.skip_callbacks:
+        report['callbacks'] = bench_callbacks(limit=50 if args.quick else None)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}', file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        thresholds = {kind: getattr(args, f'{kind}_threshold') for kind in THRESHOLDS}
+        regressions = compare(baseline, report, thresholds)
+        for section, name, metric, old, new in regressions:
+            print(f'REGRESSION {section}/{name} {metric}: {old:,.2f} -> {new:,.2f}', file=sys.stderr)
+        if regressions:
+            return 1
+        print('No regressions against the baseline', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# Client-side filtering mode for the GDP dashboards.
+#
+# With IMO_CLIENTSIDE=1 a dashboard ships its compact merged dataset (year,
+# country, indicator, medals, precomputed ranks and trendline fits) to the
+# browser once in a dcc.Store.  The year slider, country dropdown, highlight
+# and stats card are then driven by the JavaScript functions in
+# assets/imo_clientside.js, so the server only serves the initial page.
+import math
+import os
+
+from dash import ClientsideFunction, dcc
+from dash.dependencies import Input, Output, State
+
+ENABLED = os.environ.get('IMO_CLIENTSIDE', '0') == '1'
+
+NAMESPACE = 'imo'
+
+
+# NaN is not valid JSON; undefined fits (years with < 2 points) become null
+def _number(value):
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+# Column-oriented copy of the rows and fits the browser needs
+def payload(df, x_col, rank_col, trendlines, config):
+    return {
+        'year': df['year'].astype('int64').tolist(),
+        'country': df['Country'].astype(str).tolist(),
+        'x': df[x_col].astype('float64').tolist(),
+        'medals': df['total_medals'].astype('float64').tolist(),
+        'x_rank': df[rank_col].astype('int64').tolist(),
+        'medals_rank': df['medals_rank'].astype('int64').tolist(),
+        'participants': df['participants'].astype('int64').tolist(),
+        'trendlines': {
+            str(year): {
+                'slope': _number(fit['slope']),
+                'intercept': _number(fit['intercept']),
+                'r2': _number(fit['r2']),
+                'x_min': fit['x_min'],
+                'x_max': fit['x_max'],
+                'log_x': bool(fit['log_x']),
+            }
+            for year, fit in trendlines.iterrows()
+        },
+        'config': config,
+    }
+
+
+def store(store_id, data):
+    return dcc.Store(id=store_id, data=data)
+
+
+# Register the browser-side equivalents of update_country_dropdown and
+# update_graphs, reading the rows from the store.  `target` is a Dash app or
+# the dash module itself (for dashboards hosted as pages); `outputs` are the
+# scatter plot, country details and stats card ids.
+def register(target, store_id, slider_id, dropdown_id, outputs):
+    scatter_id, details_id, stats_id = outputs
+    target.clientside_callback(
+        ClientsideFunction(namespace=NAMESPACE, function_name='countryOptions'),
+        [Output(dropdown_id, 'options'),
+         Output(dropdown_id, 'value')],
+        [Input(slider_id, 'value')],
+        [State(store_id, 'data')]
+    )
+    target.clientside_callback(
+        ClientsideFunction(namespace=NAMESPACE, function_name='graphs'),
+        [Output(scatter_id, 'figure'),
+         Output(details_id, 'figure'),
+         Output(stats_id, 'children')],
+        [Input(slider_id, 'value'),
+         Input(dropdown_id, 'value')],
+        [State(store_id, 'data')]
+    )
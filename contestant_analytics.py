@@ -0,0 +1,225 @@
+# Vectorized analytics over the packed contestant arrays.
+#
+# One lexsort of all contestants by (year, total) at build time gives every
+# year's scores as a sorted segment, from which the score percentiles and each
+# contestant's percentile within the year are read with array gathers; the
+# medal cutoffs and per-problem solve rates are scatters and bincounts done
+# once.  The same segments give every contestant's competition rank within the
+# year (1 + the contestants with a higher total), which fills the ranks the
+# file leaves NA and shows where its reported ranks disagree with the totals.
+# A lexsort by (year, country, percentile) makes every team's percentiles a
+# sorted segment, so a country distribution for a year only touches that
+# year's teams.  Nothing loops over contestants in Python, and a query costs
+# the size of its answer, so the dashboard stays interactive on inputs many
+# times the size of the real file:
+#
+#     analytics = imo_data.get('contestant_analytics')
+#     analytics.cutoffs()                    # year x Gold/Silver/Bronze
+#     analytics.country_distribution(2024)   # per country quartiles
+#     analytics.rank_check()                 # per year NA / disagreeing ranks
+import numpy as np
+import pandas as pd
+
+from contestant_data import MISSING, PROBLEM_COLS
+
+MEDALS = ['Gold', 'Silver', 'Bronze']
+PERCENTILES = [10, 25, 50, 75, 90, 99]
+DISTRIBUTION = [('min', 0), ('p25', 25), ('median', 50), ('p75', 75), ('max', 100)]
+FULL_SCORE = 7
+
+
+# Values at quantiles `qs` (0-100) of sorted segments [starts, starts +
+# lengths) of `values`, with linear interpolation; NaN for empty segments
+def segment_quantiles(values, starts, lengths, qs):
+    starts = np.asarray(starts)[:, None]
+    lengths = np.asarray(lengths)[:, None]
+    positions = (np.maximum(lengths - 1, 0) * np.asarray(qs, dtype='float64') / 100)
+    below = np.floor(positions).astype('int64')
+    above = np.minimum(below + 1, np.maximum(lengths - 1, 0))
+    weight = positions - below
+    values = np.asarray(values, dtype='float64')
+    if not len(values):
+        return np.full((len(starts), len(qs)), np.nan)
+    low = values[np.minimum(starts + below, len(values) - 1)]
+    high = values[np.minimum(starts + above, len(values) - 1)]
+    return np.where(lengths > 0, low + (high - low) * weight, np.nan)
+
+
+# Start and length of each run of equal values in a sorted key array
+def runs(keys):
+    if not len(keys):
+        return np.empty(0, dtype='int64'), np.empty(0, dtype='int64')
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return starts, np.diff(np.r_[starts, len(keys)])
+
+
+# solved / scored, NaN where nothing was scored
+def _rates(solved, scored):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(scored > 0, solved / scored, np.nan)
+
+
+class ContestantAnalytics:
+    def __init__(self, contestants):
+        self.contestants = contestants
+        self.years = np.array(contestants.years(), dtype='int64')
+        year_idx = np.searchsorted(self.years, contestants.year)
+        total = contestants.total.astype('int64')
+        self.year_counts = np.bincount(year_idx, minlength=len(self.years))
+
+        # Every year's totals as a sorted segment
+        by_total = np.lexsort((total, year_idx))
+        self._sorted_totals = total[by_total]
+        self._year_starts = np.searchsorted(year_idx[by_total], np.arange(len(self.years)))
+
+        # Percentile of each contestant within the year: share of the year's
+        # contestants below, counting ties as half
+        keys = year_idx * (int(total.max(initial=0)) + 1) + total
+        sorted_keys = keys[by_total]
+        below = np.searchsorted(sorted_keys, keys, 'left') - self._year_starts[year_idx]
+        ties = np.searchsorted(sorted_keys, keys, 'right') - np.searchsorted(sorted_keys, keys, 'left')
+        self.percentile = 100 * (below + 0.5 * ties) / self.year_counts[year_idx]
+
+        # Competition rank within the year from the totals (1, 2, 2, 4)
+        year_ends = self._year_starts[year_idx] + self.year_counts[year_idx]
+        self.rank = year_ends - np.searchsorted(sorted_keys, keys, 'right') + 1
+        reported = contestants.rank.astype('int64')
+        self._rank_missing = reported == MISSING
+        self._rank_differs = ~self._rank_missing & (reported != self.rank)
+        self._year_idx = year_idx
+        # Those contestants by year and rank, with each year's first position
+        flagged = np.flatnonzero(self._rank_missing | self._rank_differs)
+        self._flagged = flagged[np.lexsort((self.rank[flagged], year_idx[flagged]))]
+        self._flagged_starts = np.searchsorted(year_idx[self._flagged], np.arange(len(self.years) + 1))
+
+        # Lowest medalled total per year and medal, from the short award
+        # label list mapped to medal indexes (-1 for none)
+        medal_of_label = np.array([
+            next((i for i, medal in enumerate(MEDALS) if label.startswith(f'{medal} medal')), -1)
+            for label in contestants.awards
+        ] + [-1], dtype='int64')
+        medal = medal_of_label[contestants.award]
+        medalled = medal >= 0
+        cutoffs = np.full((len(self.years), len(MEDALS)), np.inf)
+        np.minimum.at(cutoffs, (year_idx[medalled], medal[medalled]), total[medalled])
+        cutoffs[np.isinf(cutoffs)] = np.nan
+        self._cutoffs = cutoffs
+
+        # Full marks over contestants scored, per year and problem; the
+        # counts are kept for rates pooled over several years
+        scores = contestants.scores
+        groups = len(self.years)
+        self._scored = np.empty((groups, len(PROBLEM_COLS)))
+        self._solved = np.empty((groups, len(PROBLEM_COLS)))
+        for p in range(len(PROBLEM_COLS)):
+            self._scored[:, p] = np.bincount(year_idx, scores[:, p] != MISSING, groups)
+            self._solved[:, p] = np.bincount(year_idx, scores[:, p] == FULL_SCORE, groups)
+        self._solve_rates = _rates(self._solved, self._scored)
+
+        # Every team's percentiles as a sorted segment, year by year, and
+        # across all years, with running sums for the segment means
+        self._by_country = {}
+        for key, order in (('year', np.lexsort((self.percentile, contestants.country, year_idx))),
+                           ('all', np.lexsort((self.percentile, contestants.country)))):
+            run_keys = contestants.country[order].astype('int64')
+            if key == 'year':
+                run_keys = year_idx[order] * len(contestants.countries) + run_keys
+            starts, lengths = runs(run_keys)
+            percentiles = self.percentile[order]
+            self._by_country[key] = {
+                'percentiles': percentiles,
+                'cumulative': np.r_[0, np.cumsum(percentiles)],
+                'starts': starts,
+                'lengths': lengths,
+                'country': contestants.country[order[starts]],
+                'year': year_idx[order[starts]],
+            }
+
+    def _year_positions(self, years):
+        if years is None:
+            return np.arange(len(self.years))
+        years = np.atleast_1d(np.asarray(years, dtype='int64'))
+        positions = np.searchsorted(self.years, years)
+        known = (positions < len(self.years)) & (self.years[np.minimum(positions, len(self.years) - 1)] == years)
+        return positions[known]
+
+    # (years, medals) lowest total that won each medal; NaN where not awarded
+    def cutoffs(self, years=None):
+        positions = self._year_positions(years)
+        return pd.DataFrame(self._cutoffs[positions], columns=MEDALS,
+                            index=pd.Index(self.years[positions], name='year'))
+
+    # Reported ranks with the NA ones filled from the totals
+    def filled_ranks(self):
+        return np.where(self._rank_missing, self.rank, self.contestants.rank)
+
+    # Per year: contestants, reported ranks that are NA, and reported ranks
+    # that disagree with the competition rank of the contestant's total
+    def rank_check(self, years=None):
+        positions = self._year_positions(years)
+        groups = len(self.years)
+        missing = np.bincount(self._year_idx, self._rank_missing, groups).astype('int64')
+        differs = np.bincount(self._year_idx, self._rank_differs, groups).astype('int64')
+        return pd.DataFrame({
+            'contestants': self.year_counts[positions],
+            'missing_rank': missing[positions],
+            'different_rank': differs[positions],
+        }, index=pd.Index(self.years[positions], name='year'))
+
+    # Contestants of one year (all years for None) whose reported rank is NA
+    # or disagrees with the one reconstructed from the totals
+    def rank_mismatches(self, year=None):
+        rows = self._flagged
+        if year is not None:
+            positions = self._year_positions(year)
+            if not len(positions):
+                rows = rows[:0]
+            else:
+                rows = rows[self._flagged_starts[positions[0]]:self._flagged_starts[positions[0] + 1]]
+        frame = self.contestants.frame(rows)[['year', 'contestant', 'country', 'total', 'individual_rank']]
+        frame['reconstructed_rank'] = self.rank[rows]
+        return frame.reset_index(drop=True)
+
+    # (years, percentiles) total score at each percentile of the year
+    def score_percentiles(self, years=None, percentiles=PERCENTILES):
+        positions = self._year_positions(years)
+        values = segment_quantiles(self._sorted_totals, self._year_starts[positions],
+                                   self.year_counts[positions], percentiles)
+        return pd.DataFrame(values, columns=[f'p{q}' for q in percentiles],
+                            index=pd.Index(self.years[positions], name='year'))
+
+    # (years, problems) share of the contestants scored on a problem who got
+    # full marks; NaN for problems not set that year
+    def solve_rates(self, years=None):
+        positions = self._year_positions(years)
+        return pd.DataFrame(self._solve_rates[positions], columns=PROBLEM_COLS,
+                            index=pd.Index(self.years[positions], name='year'))
+
+    # Per problem: share of all the contestants scored on it over `years`
+    # (default all) who got full marks, so each year weighs by its contestants
+    def pooled_solve_rates(self, years=None):
+        positions = self._year_positions(years)
+        return pd.Series(_rates(self._solved[positions].sum(axis=0), self._scored[positions].sum(axis=0)),
+                         index=PROBLEM_COLS)
+
+    # Per country: contestants and the quartiles and mean of their
+    # percentiles within their year, for one year or all years (None)
+    def country_distribution(self, year=None):
+        segments = self._by_country['all' if year is None else 'year']
+        runs_of = slice(None)
+        if year is not None:
+            positions = self._year_positions(year)
+            if not len(positions):
+                return pd.DataFrame(columns=['contestants', 'mean'] + [name for name, _ in DISTRIBUTION])
+            # The year's teams are consecutive runs
+            runs_of = slice(*np.searchsorted(segments['year'], [positions[0], positions[0] + 1]))
+
+        starts, lengths = segments['starts'][runs_of], segments['lengths'][runs_of]
+        quantiles = segment_quantiles(segments['percentiles'], starts, lengths, [q for _, q in DISTRIBUTION])
+        sums = segments['cumulative'][starts + lengths] - segments['cumulative'][starts]
+        frame = pd.DataFrame(quantiles, columns=[name for name, _ in DISTRIBUTION])
+        frame.insert(0, 'mean', sums / lengths)
+        frame.insert(0, 'contestants', lengths)
+        frame.index = pd.Index(np.asarray(self.contestants.countries, dtype=object)[segments['country'][runs_of]],
+                               name='country')
+        return frame.sort_values('median', ascending=False)
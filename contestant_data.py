@@ -0,0 +1,149 @@
+# Streaming, typed ingestion of individual_results_df.csv.
+#
+# The file is parsed in fixed-size chunks with explicit dtypes and packed into
+# compact NumPy column arrays sorted by year, so the per-year slices the
+# contestant views need are plain array views and no full-width DataFrame of
+# the file is ever held in memory.
+#
+# NA conventions of the source file: the literal `NA` marks a missing problem
+# score (e.g. p7 in years with six problems) or a missing rank, and an empty
+# award means the contestant received no award.  Contestant and country names
+# are read verbatim, never converted to missing values.
+import os
+
+import numpy as np
+import pandas as pd
+
+PROBLEM_COLS = ['p1', 'p2', 'p3', 'p4', 'p5', 'p6', 'p7']
+COLUMNS = ['year', 'contestant', 'country'] + PROBLEM_COLS + ['total', 'individual_rank', 'award']
+
+# Rows parsed per chunk; IMO_CHUNK_ROWS overrides it for very large inputs
+CHUNK_ROWS = int(os.environ.get('IMO_CHUNK_ROWS', '50000'))
+
+# Parse dtypes; missing scores and ranks arrive as NaN and are packed below
+DTYPES = {
+    'year': 'int16',
+    'contestant': 'object',
+    'country': 'category',
+    **{col: 'float32' for col in PROBLEM_COLS},
+    'total': 'int16',
+    'individual_rank': 'float32',
+    'award': 'category',
+}
+NA_VALUES = {
+    **{col: ['NA'] for col in PROBLEM_COLS},
+    'individual_rank': ['NA'],
+    'award': [''],
+}
+
+# Stored in place of missing scores, ranks and awards in the packed arrays
+MISSING = -1
+
+
+def read_chunks(path, chunk_rows=None):
+    return pd.read_csv(
+        path,
+        usecols=COLUMNS,
+        dtype=DTYPES,
+        keep_default_na=False,
+        na_values=NA_VALUES,
+        chunksize=chunk_rows or CHUNK_ROWS,
+    )
+
+
+# Map a categorical chunk column onto codes in a growing, shared label list
+def _global_codes(column, labels, positions):
+    chunk_labels = column.cat.categories
+    lookup = np.empty(len(chunk_labels) + 1, dtype='int32')
+    for i, label in enumerate(chunk_labels):
+        if label not in positions:
+            positions[label] = len(labels)
+            labels.append(label)
+        lookup[i] = positions[label]
+    lookup[-1] = MISSING  # code -1 (NaN) in the chunk
+    return lookup[column.cat.codes.to_numpy()]
+
+
+def _packed(values, dtype):
+    return np.where(np.isnan(values), MISSING, values).astype(dtype)
+
+
+# Column arrays for every contestant, sorted by year (file order within a
+# year).  Countries and awards are small-int codes into `countries` / `awards`.
+class ContestantArrays:
+    def __init__(self, columns, countries, awards):
+        self.countries = countries
+        self.awards = awards
+
+        order = np.argsort(columns['year'], kind='stable')
+        self.year = columns['year'][order]
+        self.contestant = columns['contestant'][order]
+        self.country = columns['country'][order]
+        self.scores = columns['scores'][order]
+        self.total = columns['total'][order]
+        self.rank = columns['rank'][order]
+        self.award = columns['award'][order]
+
+        # year -> (start, stop) of its rows
+        years, starts = np.unique(self.year, return_index=True)
+        stops = np.append(starts[1:], len(self.year))
+        self.bounds = {int(year): (int(start), int(stop)) for year, start, stop in zip(years, starts, stops)}
+
+    @classmethod
+    def from_csv(cls, path, chunk_rows=None):
+        countries, country_positions = [], {}
+        awards, award_positions = [], {}
+        parts = {name: [] for name in ('year', 'contestant', 'country', 'scores', 'total', 'rank', 'award')}
+
+        for chunk in read_chunks(path, chunk_rows):
+            parts['year'].append(chunk['year'].to_numpy())
+            parts['contestant'].append(chunk['contestant'].to_numpy(dtype=object))
+            parts['country'].append(_global_codes(chunk['country'], countries, country_positions))
+            parts['scores'].append(_packed(chunk[PROBLEM_COLS].to_numpy(), 'int8'))
+            parts['total'].append(chunk['total'].to_numpy())
+            parts['rank'].append(_packed(chunk['individual_rank'].to_numpy(), 'int16'))
+            parts['award'].append(_global_codes(chunk['award'], awards, award_positions).astype('int8'))
+
+        columns = {
+            name: np.concatenate(values) if values else np.empty(0)
+            for name, values in parts.items()
+        }
+        if not parts['scores']:
+            columns['scores'] = np.empty((0, len(PROBLEM_COLS)), dtype='int8')
+        return cls(columns, countries, awards)
+
+    def __len__(self):
+        return len(self.year)
+
+    def years(self):
+        return list(self.bounds)
+
+    # Row slice for one year (empty if the year is unknown)
+    def year_slice(self, year):
+        start, stop = self.bounds.get(year, (0, 0))
+        return slice(start, stop)
+
+    # Decoded DataFrame for the given rows only, in the source file's schema
+    def frame(self, rows):
+        scores = self.scores[rows].astype('float32')
+        scores[scores == MISSING] = np.nan
+        rank = self.rank[rows].astype('float32')
+        rank[rank == MISSING] = np.nan
+        countries = np.asarray(self.countries, dtype=object)
+        awards = np.asarray(self.awards + [None], dtype=object)  # index -1 -> None
+
+        frame = pd.DataFrame({
+            'year': self.year[rows],
+            'contestant': self.contestant[rows],
+            'country': countries[self.country[rows]],
+        })
+        for i, col in enumerate(PROBLEM_COLS):
+            frame[col] = scores[:, i]
+        frame['total'] = self.total[rows]
+        frame['individual_rank'] = rank
+        frame['award'] = awards[self.award[rows]]
+        return frame
+
+    def nbytes(self):
+        arrays = (self.year, self.country, self.scores, self.total, self.rank, self.award)
+        return sum(array.nbytes for array in arrays) + self.contestant.nbytes
@@ -0,0 +1,175 @@
+import dash
+from dash import dash_table, dcc, html
+from dash.dependencies import Input, Output
+import plotly.graph_objects as go
+
+import imo_data
+import metrics
+from contestant_analytics import MEDALS
+
+# Component ids, namespaced so the dashboard can be hosted as a page of the
+# multi-page app (app.py)
+PREFIX = 'contestant-stats'
+YEAR_DROPDOWN = f'{PREFIX}-year'
+CUTOFF_GRAPH = f'{PREFIX}-cutoffs'
+PERCENTILE_GRAPH = f'{PREFIX}-percentiles'
+DISTRIBUTION_GRAPH = f'{PREFIX}-distribution'
+SOLVE_RATE_GRAPH = f'{PREFIX}-solve-rates'
+RANK_GRAPH = f'{PREFIX}-rank-check'
+RANK_TABLE = f'{PREFIX}-rank-mismatches'
+
+# Teams shown in the distribution chart, by median percentile
+TOP_COUNTRIES = 40
+
+MEDAL_COLORS = {'Gold': 'gold', 'Silver': 'silver', 'Bronze': 'brown'}
+
+RANK_COLUMNS = ['contestant', 'country', 'total', 'individual_rank', 'reconstructed_rank']
+
+
+# Cutoffs, percentiles and distributions over the packed contestant arrays,
+# built on first use
+def analytics():
+    return imo_data.get('contestant_analytics')
+
+
+def cutoff_figure():
+    cutoffs = analytics().cutoffs()
+    fig = go.Figure()
+    for medal in MEDALS:
+        fig.add_trace(go.Scatter(x=cutoffs.index, y=cutoffs[medal], mode='lines+markers',
+                                 name=medal, line=dict(color=MEDAL_COLORS[medal])))
+    fig.update_layout(title='Lowest Total Score Awarded Each Medal', xaxis_title='Year',
+                      yaxis_title='Total Score', height=450)
+    return fig
+
+
+def percentile_figure():
+    percentiles = analytics().score_percentiles()
+    fig = go.Figure()
+    for column in percentiles.columns:
+        fig.add_trace(go.Scatter(x=percentiles.index, y=percentiles[column], mode='lines',
+                                 name=f'{column[1:]}th percentile'))
+    fig.update_layout(title='Total Score Percentiles by Year', xaxis_title='Year',
+                      yaxis_title='Total Score', height=450)
+    return fig
+
+
+# Per year, reported ranks that are NA or disagree with the ranks rebuilt
+# from the totals
+def rank_check_figure():
+    check = analytics().rank_check()
+    fig = go.Figure([
+        go.Bar(x=check.index, y=check['missing_rank'], name='Rank missing', marker_color='#7f8c8d'),
+        go.Bar(x=check.index, y=check['different_rank'], name='Rank differs from totals', marker_color='#e74c3c'),
+    ])
+    fig.update_layout(title='Reported Ranks Missing or Disagreeing With the Totals', xaxis_title='Year',
+                      yaxis_title='Contestants', barmode='stack', height=400)
+    return fig
+
+
+# Page layout; Dash pages passes the URL query parameters, which are unused
+def layout(**query_parameters):
+    years = analytics().years.tolist()
+    return html.Div([
+        html.Div([
+            html.H1("IMO Contestant Statistics",
+                    style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': 30}),
+            html.P("Medal cutoffs, score percentiles and how each team's contestants placed within their year",
+                   style={'textAlign': 'center', 'color': '#7f8c8d'})
+        ], style={'marginBottom': 40}),
+
+        html.Div([
+            dcc.Graph(id=CUTOFF_GRAPH, figure=cutoff_figure(), style={'width': '50%'}),
+            dcc.Graph(id=PERCENTILE_GRAPH, figure=percentile_figure(), style={'width': '50%'})
+        ], style={'display': 'flex'}),
+
+        html.Div([
+            html.Label("Select Year:", style={'fontWeight': 'bold', 'color': '#2c3e50'}),
+            dcc.Dropdown(
+                id=YEAR_DROPDOWN,
+                options=[{'label': 'All years', 'value': 'all'}] +
+                        [{'label': str(year), 'value': year} for year in reversed(years)],
+                value=years[-1],
+                clearable=False,
+                style={'width': '50%', 'marginBottom': 20}
+            )
+        ]),
+
+        dcc.Graph(id=DISTRIBUTION_GRAPH),
+        dcc.Graph(id=SOLVE_RATE_GRAPH),
+
+        dcc.Graph(id=RANK_GRAPH, figure=rank_check_figure()),
+        html.P("Contestants of the selected year whose reported rank is missing or differs from the "
+               "competition rank of their total (1 + the contestants with a higher total):",
+               style={'color': '#7f8c8d'}),
+        dash_table.DataTable(
+            id=RANK_TABLE,
+            columns=[{'name': col, 'id': col} for col in RANK_COLUMNS],
+            page_size=10,
+            sort_action='native',
+            style_cell={'fontFamily': 'Arial', 'padding': '5px'},
+            style_header={'fontWeight': 'bold', 'backgroundColor': '#f8f9fa'}
+        )
+    ], style={'padding': '20px', 'fontFamily': 'Arial'})
+
+
+# Callback for the selected year: each team's spread of percentiles (drawn
+# from the precomputed quartiles, so no contestant rows are sent), the share
+# of full scores on each problem, and the contestants whose reported rank is
+# missing or disagrees with their total
+def update_year(selected_year):
+    year = None if selected_year == 'all' else selected_year
+    period = 'All Years' if year is None else str(year)
+
+    distribution = analytics().country_distribution(year).head(TOP_COUNTRIES)
+    distribution_fig = go.Figure(go.Box(
+        x=distribution.index,
+        lowerfence=distribution['min'],
+        q1=distribution['p25'],
+        median=distribution['median'],
+        q3=distribution['p75'],
+        upperfence=distribution['max'],
+        mean=distribution['mean'],
+        customdata=distribution['contestants'],
+        hovertemplate='%{x}<br>%{customdata} contestants<extra></extra>',
+        marker_color='#2c3e50'
+    ))
+    distribution_fig.update_layout(
+        title=f'Percentile of Each Contestant Within the Year, Top {len(distribution)} Teams ({period})',
+        xaxis_title='Country', yaxis_title='Percentile', yaxis_range=[0, 100], height=500)
+
+    # Over all years, pooled so every year counts by its contestants scored
+    solve_rates = analytics().pooled_solve_rates(None if year is None else [year]).dropna()
+    solve_rate_fig = go.Figure(go.Bar(x=solve_rates.index.str.upper(), y=solve_rates * 100,
+                                      marker_color='#2c3e50'))
+    solve_rate_fig.update_layout(
+        title=f'Share of Contestants With a Full Score on Each Problem ({period})',
+        xaxis_title='Problem', yaxis_title='Full Scores (%)', height=450)
+
+    mismatches = analytics().rank_mismatches(year)[RANK_COLUMNS].astype(object)
+    mismatches = mismatches.where(mismatches.notna(), None)
+    return distribution_fig, solve_rate_fig, mismatches.to_dict('records')
+
+
+# Attach the callback to `target`: a standalone Dash app, or the dash module
+# itself (dash.callback) when the dashboard is hosted as a page
+def register_callbacks(target):
+    target.callback(
+        [Output(DISTRIBUTION_GRAPH, 'figure'),
+         Output(SOLVE_RATE_GRAPH, 'figure'),
+         Output(RANK_TABLE, 'data')],
+        Input(YEAR_DROPDOWN, 'value')
+    )(update_year)
+
+
+# Standalone single-dashboard app
+def create_app():
+    app = dash.Dash(__name__)
+    app.layout = layout
+    register_callbacks(app)
+    metrics.instrument(app)
+    return app
+
+
+if __name__ == '__main__':
+    create_app().run(debug=True, port=8054)
@@ -0,0 +1,243 @@
+import math
+import re
+
+import dash
+from dash import ctx, dash_table, dcc, html
+from dash.dependencies import Input, Output
+import numpy as np
+import pandas as pd
+
+import imo_data
+import metrics
+from contestant_data import MISSING, PROBLEM_COLS
+
+# Component ids, namespaced so the dashboard can be hosted as a page of the
+# multi-page app (app.py)
+PREFIX = 'contestant'
+YEAR_DROPDOWN = f'{PREFIX}-year'
+COUNT = f'{PREFIX}-count'
+TABLE = f'{PREFIX}-table'
+
+PAGE_SIZE = 25
+
+TABLE_COLUMNS = ['year', 'contestant', 'country'] + PROBLEM_COLS + ['total', 'individual_rank', 'award']
+TEXT_COLUMNS = {'contestant', 'country', 'award'}
+
+# Filter operators understood by the table's custom filter_query
+OPERATORS = [
+    ('>=', ['ge ', '>=']),
+    ('<=', ['le ', '<=']),
+    ('<', ['lt ', '<']),
+    ('>', ['gt ', '>']),
+    ('!=', ['ne ', '!=']),
+    ('=', ['eq ', '=']),
+    ('contains', ['contains ']),
+]
+SPELLINGS = {spelling: operator for operator, spellings in OPERATORS for spelling in spellings}
+# `{column} operator value`, with the operator only the token right after the
+# column, so spellings inside the value ("George Lusztig") are left alone
+FILTER_PART = re.compile(r'\{(.+?)\}\s*(' + '|'.join(map(re.escape, SPELLINGS)) + r')\s*(.*)', re.DOTALL)
+
+# Packed contestant arrays (streamed in chunks, never a full frame), loaded on
+# first use
+def contestant_arrays():
+    return imo_data.get('contestants')
+
+
+# Page layout; Dash pages passes the URL query parameters, which are unused
+def layout(**query_parameters):
+    contestants = contestant_arrays()
+    return html.Div([
+        html.Div([
+            html.H1("IMO Contestant Results",
+                    style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': 30}),
+            html.P("Browse every contestant's scores; filtering, sorting and paging run on the server",
+                   style={'textAlign': 'center', 'color': '#7f8c8d'})
+        ], style={'marginBottom': 40}),
+
+        html.Div([
+            html.Label("Select Year:", style={'fontWeight': 'bold', 'color': '#2c3e50'}),
+            dcc.Dropdown(
+                id=YEAR_DROPDOWN,
+                options=[{'label': 'All years', 'value': 'all'}] +
+                        [{'label': str(year), 'value': year} for year in reversed(contestants.years())],
+                value=contestants.years()[-1],
+                clearable=False,
+                style={'width': '50%', 'marginBottom': 20}
+            )
+        ]),
+
+        html.P(id=COUNT, style={'color': '#7f8c8d'}),
+
+        dash_table.DataTable(
+            id=TABLE,
+            columns=[{'name': col, 'id': col, 'type': 'text' if col in TEXT_COLUMNS else 'numeric'}
+                     for col in TABLE_COLUMNS],
+            page_current=0,
+            page_size=PAGE_SIZE,
+            page_action='custom',
+            filter_action='custom',
+            filter_query='',
+            sort_action='custom',
+            sort_mode='single',
+            sort_by=[],
+            style_cell={'fontFamily': 'Arial', 'padding': '5px'},
+            style_header={'fontWeight': 'bold', 'backgroundColor': '#f8f9fa'}
+        )
+    ], style={'padding': '20px', 'fontFamily': 'Arial'})
+
+
+# Split one "{column} op value" term of a filter_query
+def split_filter_part(filter_part):
+    match = FILTER_PART.fullmatch(filter_part.strip())
+    if match is None:
+        return None, None, None
+    name, spelling, value = match.groups()
+    value = value.strip()
+    if value and value[0] == value[-1] and value[0] in ("'", '"', '`'):
+        value = value[1:-1].replace('\\' + value[0], value[0])
+    else:
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+    return name, SPELLINGS[spelling], value
+
+
+# Values of one column for the given rows: numbers, or codes plus labels for
+# the coded text columns
+def column_values(name, rows):
+    contestants = contestant_arrays()
+    if name == 'year':
+        return contestants.year[rows]
+    if name == 'total':
+        return contestants.total[rows]
+    if name == 'individual_rank':
+        return contestants.rank[rows]
+    if name in PROBLEM_COLS:
+        return contestants.scores[rows, PROBLEM_COLS.index(name)]
+    if name == 'country':
+        return contestants.country[rows]
+    if name == 'award':
+        return contestants.award[rows]
+    return contestants.contestant[rows]
+
+
+def text_labels(name):
+    contestants = contestant_arrays()
+    return {'country': contestants.countries, 'award': contestants.awards}.get(name)
+
+
+# Boolean mask over `rows` for one filter term
+def filter_mask(name, operator, value, rows):
+    values = column_values(name, rows)
+
+    if name in TEXT_COLUMNS:
+        text = str(value).lower()
+        labels = text_labels(name)
+        if labels is None:
+            # Free-text contestant names
+            names = pd.Series(values, dtype=object).str.lower()
+            if operator == 'contains':
+                return names.str.contains(text, regex=False).to_numpy()
+            matches = (names == text).to_numpy()
+            return ~matches if operator == '!=' else matches
+        # Match against the small label list, then compare codes
+        if operator == 'contains':
+            codes = [code for code, label in enumerate(labels) if text in label.lower()]
+        else:
+            codes = [code for code, label in enumerate(labels) if label.lower() == text]
+        matches = np.isin(values, codes)
+        return ~matches if operator == '!=' else matches
+
+    if not isinstance(value, float):
+        return np.zeros(len(values), dtype=bool)
+    present = values != MISSING if name in PROBLEM_COLS or name == 'individual_rank' else True
+    compare = {
+        '>=': np.greater_equal, '<=': np.less_equal, '<': np.less, '>': np.greater,
+        '!=': np.not_equal, '=': np.equal, 'contains': np.equal,
+    }[operator]
+    return compare(values, value) & present
+
+
+# Sort keys for `rows`: whether each value is missing, and the value to order
+# by (coded text columns by label)
+def sort_key(name, rows):
+    values = column_values(name, rows)
+    labels = text_labels(name)
+    if labels is not None:
+        label_rank = np.argsort(np.argsort(np.asarray(labels, dtype=object)))
+        return values == MISSING, label_rank[np.where(values == MISSING, 0, values)]
+    if name == 'contestant':
+        names = pd.Series(values, dtype=object).str.lower()
+        return np.zeros(len(rows), dtype=bool), names.rank(method='first').to_numpy()
+    if name in PROBLEM_COLS or name == 'individual_rank':
+        return values == MISSING, values
+    return np.zeros(len(rows), dtype=bool), values
+
+
+# Callback to fetch one page of the filtered, sorted table.  A new year or
+# filter starts again from the first page.
+def update_table(selected_year, page_current, page_size, filter_query, sort_by):
+    contestants = contestant_arrays()
+    triggered = ctx.triggered_prop_ids
+    if f'{YEAR_DROPDOWN}.value' in triggered or f'{TABLE}.filter_query' in triggered:
+        page_current = 0
+
+    # Candidate rows: one year's contiguous slice, or everything
+    if selected_year == 'all':
+        rows = np.arange(len(contestants))
+    else:
+        year_rows = contestants.year_slice(selected_year)
+        rows = np.arange(year_rows.start, year_rows.stop)
+
+    for filter_part in (filter_query or '').split(' && '):
+        name, operator, value = split_filter_part(filter_part)
+        if name in TABLE_COLUMNS:
+            rows = rows[filter_mask(name, operator, value, rows)]
+
+    if sort_by:
+        missing, key = sort_key(sort_by[0]['column_id'], rows)
+        key = np.asarray(key, dtype='float64')
+        if sort_by[0]['direction'] == 'desc':
+            key = -key
+        # Missing values last in either direction, ties in row order
+        rows = rows[np.lexsort((key, missing))]
+
+    # Decode only the requested page
+    page_size = page_size or PAGE_SIZE
+    page_rows = rows[page_current * page_size:(page_current + 1) * page_size]
+    page = contestants.frame(page_rows).astype(object)
+    page = page.where(page.notna(), None)
+
+    page_count = max(1, math.ceil(len(rows) / page_size))
+    return page.to_dict('records'), page_count, page_current, f'{len(rows):,} contestants match'
+
+
+# Attach the callback to `target`: a standalone Dash app, or the dash module
+# itself (dash.callback) when the dashboard is hosted as a page
+def register_callbacks(target):
+    target.callback(
+        [Output(TABLE, 'data'),
+         Output(TABLE, 'page_count'),
+         Output(TABLE, 'page_current'),
+         Output(COUNT, 'children')],
+        [Input(YEAR_DROPDOWN, 'value'),
+         Input(TABLE, 'page_current'),
+         Input(TABLE, 'page_size'),
+         Input(TABLE, 'filter_query'),
+         Input(TABLE, 'sort_by')]
+    )(update_table)
+
+
+# Standalone single-dashboard app
+def create_app():
+    app = dash.Dash(__name__)
+    app.layout = layout
+    register_callbacks(app)
+    metrics.instrument(app)
+    return app
+
+
+if __name__ == '__main__':
+    create_app().run(debug=True, port=8053)
@@ -0,0 +1,100 @@
+# Pre-materialized rollup cube over the categorical dimensions of a frame.
+#
+# The cube is built once from the row-level frame: one aggregation at the
+# finest grain (every dimension), from which every coarser grouping, all
+# 2**len(dimensions) of them, is rolled up.  Each grouping holds the sum and
+# the non-null count of every measure, so sums, counts and means of any slice
+# or roll-up are read from a small pre-aggregated table:
+#
+#     cube = imo_data.get('gii_cube')
+#     cube.query(['Year', 'Continent'], {'GII': 'mean', 'total_medals': 'sum'},
+#                filters={'Hemisphere': 'Southern Hemisphere', 'Year': list(range(2010, 2022))})
+#
+# The GII cube covers the years of the GII file, 1990-2021.
+import itertools
+
+import numpy as np
+import pandas as pd
+
+STATS = ('sum', 'count', 'mean')
+
+
+class AggregateCube:
+    def __init__(self, dimensions, measures, groupings):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        # Tuple of dimensions (in cube order) -> aggregated frame
+        self.groupings = groupings
+
+    @classmethod
+    def from_frame(cls, df, dimensions, measures):
+        columns = [f'{measure}_{stat}' for measure in measures for stat in ('sum', 'count')]
+
+        # Finest grain; missing dimension values are kept as their own group
+        df = df.assign(**{measure: df[measure].astype('float64') for measure in measures})
+        finest = df.groupby(list(dimensions), observed=True, dropna=False, sort=True)[list(measures)]
+        finest = pd.concat({'sum': finest.sum(), 'count': finest.count()}, axis=1)
+        finest.columns = [f'{measure}_{stat}' for stat, measure in finest.columns]
+        finest = finest[columns].reset_index()
+
+        groupings = {}
+        for size in range(len(dimensions) + 1):
+            for key in itertools.combinations(dimensions, size):
+                if size == len(dimensions):
+                    groupings[key] = finest
+                elif size == 0:
+                    groupings[key] = finest[columns].sum().to_frame().T
+                else:
+                    groupings[key] = finest.groupby(list(key), observed=True, dropna=False,
+                                                    sort=True)[columns].sum().reset_index()
+        return cls(dimensions, measures, groupings)
+
+    # Measures per group of `by`, e.g. measures={'GII': 'mean'} (default: the
+    # mean of every measure).  `filters` maps a dimension to one value or a
+    # list of values to keep; rows missing a `by` value are dropped, as in a
+    # pandas groupby.
+    def query(self, by=(), measures=None, filters=None):
+        by = list(by)
+        filters = filters or {}
+        measures = measures or {measure: 'mean' for measure in self.measures}
+        unknown = (set(by) | set(filters)) - set(self.dimensions)
+        if unknown:
+            raise KeyError(f"Unknown dimensions {sorted(unknown)}; available: {self.dimensions}")
+        for measure, stat in measures.items():
+            if measure not in self.measures or stat not in STATS:
+                raise ValueError(f"Cannot compute {stat!r} of {measure!r}; measures: {self.measures}, "
+                                 f"stats: {STATS}")
+
+        # Smallest grouping that still has every dimension we filter on
+        key = tuple(dim for dim in self.dimensions if dim in by or dim in filters)
+        table = self.groupings[key]
+
+        if filters:
+            mask = pd.Series(True, index=table.index)
+            for dim, values in filters.items():
+                values = values if isinstance(values, (list, tuple, set)) else [values]
+                mask &= table[dim].isin(values)
+            table = table[mask]
+
+        columns = [f'{measure}_{stat}' for measure in measures for stat in ('sum', 'count')]
+        if len(key) > len(by):
+            # Roll the filtered cells up to the requested grain
+            if by:
+                table = table.groupby(by, observed=True, sort=True)[columns].sum().reset_index()
+            else:
+                table = table[columns].sum().to_frame().T
+        elif by:
+            table = table.dropna(subset=by)
+
+        result = table[by].reset_index(drop=True)
+        for measure, stat in measures.items():
+            total = table[f'{measure}_sum'].to_numpy()
+            count = table[f'{measure}_count'].to_numpy()
+            if stat == 'sum':
+                result[measure] = total
+            elif stat == 'count':
+                result[measure] = count
+            else:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    result[measure] = np.where(count > 0, total / count, np.nan)
+        return result
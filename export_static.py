@@ -0,0 +1,254 @@
+# Export every dashboard state to a static bundle.
+#
+#     python export_static.py                     # -> static_bundle/
+#     python export_static.py --output site --jobs 8
+#
+# Every state reachable in the GDP, GDP per capita and gender dashboards
+# (every year x country, every gender view) is rendered across a process pool
+# with the dashboards' own renderers and written as figure JSON, next to the
+# HTML shells from static_shell/ and a local copy of plotly.min.js.  The
+# bundle can be served by any static file server:
+#
+#     static_bundle/
+#         index.html, gdp.html, gender.html, viewer.js, plotly.min.js
+#         gdp/index.json              years and the countries in each
+#         gdp/year-2022.json          base scatter of one year
+#         gdp/2022/japan.json         highlight, time series and stats card
+#         gender/index.json, gender/gii_trend.json, ...
+#         manifest.json
+#
+# The export is incremental: manifest.json records a hash of each state's
+# inputs (its rows, its trendline, the renderer code and settings), and a
+# re-run only renders the states whose hash changed.
+import argparse
+import concurrent.futures
+import hashlib
+import html
+import importlib
+import json
+import os
+import re
+import shutil
+import sys
+
+import pandas as pd
+import plotly
+from plotly.io.json import to_json_plotly
+
+import imo_data
+import lean_payload
+
+DEFAULT_OUTPUT = 'static_bundle'
+SHELL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static_shell')
+PLOTLY_JS = os.path.join(os.path.dirname(plotly.__file__), 'package_data', 'plotly.min.js')
+
+# Code every state's figures depend on, besides the dashboard module itself
+RENDER_SOURCES = ('imo_data.py', 'figure_cache.py', 'lean_payload.py', 'cube.py', 'export_static.py')
+
+
+# ---------------------------------------------------------------------------
+# Input hashes
+# ---------------------------------------------------------------------------
+
+def _sha(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+def frame_digest(df):
+    return _sha(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes(), list(df.columns))
+
+
+# Renderer code and the settings that change the rendered output
+def code_digest(module_name):
+    root = os.path.dirname(os.path.abspath(__file__))
+    parts = [imo_data.RANK_METHOD, imo_data.TRENDLINE_LOG_X, imo_data.COMPACT_DTYPES, lean_payload.ENABLED]
+    for name in (f'{module_name}.py',) + RENDER_SOURCES:
+        with open(os.path.join(root, name), 'rb') as f:
+            parts.append(f.read())
+    return _sha(*parts)
+
+
+def slug(country):
+    return re.sub(r'[^a-z0-9]+', '-', country.lower()).strip('-')
+
+
+# (key, file, input hash, task) for every state of a GDP dashboard; a task is
+# ('year', year) for the base scatter or ('state', year, country)
+def gdp_states(module):
+    index = module.index()
+    trendlines = module.trendlines()
+    code = code_digest(module.__name__)
+    country_digests = {country: frame_digest(index.country(country)) for country in index.by_country}
+
+    states = []
+    for year in index.years():
+        year = int(year)
+        year_digest = _sha(frame_digest(index.year(year)), repr(trendlines.loc[year].tolist()))
+        states.append((f'{module.__name__}/year/{year}', f'{module.__name__}/year-{year}.json',
+                       _sha(code, year_digest), ('year', year)))
+        for country in index.countries(year):
+            states.append((f'{module.__name__}/{year}/{country}', f'{module.__name__}/{year}/{slug(country)}.json',
+                           _sha(code, year_digest, country_digests[country]), ('state', year, country)))
+    return states
+
+
+def gender_states(module):
+    code = code_digest(module.__name__)
+    inputs = _sha(frame_digest(imo_data.get('gii_merged')), frame_digest(imo_data.get('timeline')))
+    return [(f'gender/{view}', f'gender/{view}.json', _sha(code, inputs), ('view', view))
+            for view in module.VIEWS]
+
+
+# ---------------------------------------------------------------------------
+# Rendering (runs in the worker processes)
+# ---------------------------------------------------------------------------
+
+def _css(style):
+    return ';'.join(re.sub(r'([A-Z])', r'-\1', key).lower() + f':{value}' for key, value in style.items())
+
+
+# Static HTML for a Dash html component tree (the stats card)
+def component_html(node):
+    if node is None:
+        return ''
+    if isinstance(node, (list, tuple)):
+        return ''.join(component_html(child) for child in node)
+    if hasattr(node, 'to_plotly_json'):
+        node = node.to_plotly_json()
+    if not isinstance(node, dict):
+        return html.escape(str(node))
+    tag = node['type'].lower()
+    props = node.get('props', {})
+    style = f' style="{html.escape(_css(props["style"]))}"' if props.get('style') else ''
+    return f'<{tag}{style}>{component_html(props.get("children"))}</{tag}>'
+
+
+def render_task(module_name, task):
+    module = importlib.import_module(module_name)
+    if task[0] == 'year':
+        return to_json_plotly(module.render_year(task[1]))
+    if task[0] == 'state':
+        _, year, country = task
+        time_series, stats_card = module.render_country(year, country)
+        return to_json_plotly({
+            'highlight': module.highlight_trace(year, country),
+            'details': time_series,
+            'stats': component_html(stats_card),
+        })
+    return to_json_plotly(module.update_graph(task[1]))
+
+
+# Render a batch of states of one dashboard: [(file, task)] -> [(file, json)]
+def render_batch(module_name, batch):
+    return [(path, render_task(module_name, task)) for path, task in batch]
+
+
+# ---------------------------------------------------------------------------
+# Bundle
+# ---------------------------------------------------------------------------
+
+def write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(output):
+    try:
+        with open(os.path.join(output, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'states': {}}
+
+
+def gdp_index_json(module):
+    index = module.index()
+    return json.dumps({
+        'years': [int(year) for year in index.years()],
+        'countries': {
+            str(int(year)): [[country, slug(country)] for country in index.countries(year)]
+            for year in index.years()
+        },
+    })
+
+
+def export(output, jobs=None, force=False):
+    import gdp
+    import gdp_per_capita
+    import gender
+
+    states = {}
+    for module in (gdp, gdp_per_capita):
+        for key, path, digest, task in gdp_states(module):
+            states[key] = (module.__name__, path, digest, task)
+    for key, path, digest, task in gender_states(gender):
+        states[key] = ('gender', path, digest, task)
+
+    manifest = load_manifest(output)
+    previous = manifest['states']
+    stale = [
+        key for key, (_, path, digest, _) in states.items()
+        if force or previous.get(key, {}).get('hash') != digest
+        or not os.path.exists(os.path.join(output, path))
+    ]
+
+    # One batch per dashboard and year (or per gender view) keeps the
+    # per-year base figure and its countries in the same worker's cache
+    batches = {}
+    for key in stale:
+        module_name, path, _, task = states[key]
+        batches.setdefault((module_name, task[1]), []).append((path, task))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(render_batch, module_name, batch)
+                   for (module_name, _), batch in batches.items()]
+        for future in concurrent.futures.as_completed(futures):
+            for path, text in future.result():
+                write_text(os.path.join(output, path), text)
+
+    # Files of states that no longer exist
+    for key, entry in previous.items():
+        if key not in states:
+            try:
+                os.remove(os.path.join(output, entry['file']))
+            except OSError:
+                pass
+
+    for module in (gdp, gdp_per_capita):
+        write_text(os.path.join(output, module.__name__, 'index.json'), gdp_index_json(module))
+    write_text(os.path.join(output, 'gender', 'index.json'), json.dumps({
+        'views': [[option['value'], option['label']]
+                  for option in gender.layout[gender.VIZ_TYPE].options],
+        'default': gender.DEFAULT_VIEW,
+    }))
+    for name in os.listdir(SHELL_DIR):
+        shutil.copyfile(os.path.join(SHELL_DIR, name), os.path.join(output, name))
+    if not os.path.exists(os.path.join(output, 'plotly.min.js')):
+        shutil.copyfile(PLOTLY_JS, os.path.join(output, 'plotly.min.js'))
+
+    manifest = {'states': {key: {'file': path, 'hash': digest}
+                           for key, (_, path, digest, _) in states.items()}}
+    write_text(os.path.join(output, 'manifest.json'), json.dumps(manifest, indent=1, sort_keys=True))
+    return len(stale), len(states)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export every dashboard state to a static bundle.')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f'bundle directory (default {DEFAULT_OUTPUT})')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--force', action='store_true', help='re-render every state')
+    args = parser.parse_args(argv)
+
+    rendered, total = export(args.output, args.jobs, args.force)
+    print(f'Rendered {rendered} of {total} states into {args.output}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
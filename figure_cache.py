@@ -0,0 +1,74 @@
+# Bounded LRU memoization for dashboard figure renderers.
+#
+# The dashboards render figures from static data, so a renderer's output only
+# depends on its arguments (e.g. the selected year and country).  Renderers
+# wrapped with memoize_figures() keep their most recently used results, already
+# converted to plain JSON-ready dicts, and popular states are served straight
+# from memory instead of being rebuilt through Plotly on every request.
+#
+# Entries are keyed by the data generation too (imo_data.generation()), so a
+# figure rendered from data that has since been reloaded is never served.
+import functools
+import os
+
+import imo_data
+import lean_payload
+
+# Entries kept per renderer; IMO_FIGURE_CACHE_SIZE=0 disables caching
+FIGURE_CACHE_SIZE = int(os.environ.get('IMO_FIGURE_CACHE_SIZE', '256'))
+# Pre-render the latest year when a dashboard starts
+WARM_FIGURE_CACHE = os.environ.get('IMO_WARM_FIGURE_CACHE', '0') == '1'
+
+_renderers = {}
+
+
+# Figures become plain dicts once, when they enter the cache (lean ones in
+# lean payload mode, see lean_payload.py)
+def to_json_ready(value, label=None):
+    if hasattr(value, 'to_plotly_json') and hasattr(value, 'to_dict'):
+        fig = value.to_dict()
+        if lean_payload.ENABLED:
+            lean = lean_payload.lean_figure(fig)
+            lean_payload.record(label, lean_payload.json_bytes(fig), lean_payload.json_bytes(lean))
+            return lean
+        return fig
+    return value
+
+
+def memoize_figures(name, maxsize=None):
+    maxsize = FIGURE_CACHE_SIZE if maxsize is None else maxsize
+
+    def decorate(render):
+        @functools.lru_cache(maxsize=maxsize)
+        def render_serialized(generation, *args):
+            result = render(*args)
+            label = f"{name}({', '.join(map(repr, args))})"
+            if isinstance(result, tuple):
+                return tuple(to_json_ready(value, label) for value in result)
+            return to_json_ready(result, label)
+
+        # The generation is read before rendering: a render racing a reload
+        # is at worst stored under the old generation
+        @functools.wraps(render)
+        def cached(*args):
+            return render_serialized(imo_data.generation(), *args)
+
+        _renderers[name] = render_serialized
+        return cached
+    return decorate
+
+
+# Render every argument tuple in `states` so the first users get cache hits
+def warm(render, states):
+    for state in states:
+        render(*state)
+
+
+# Hit/miss/size counters per renderer
+def stats():
+    return {name: render.cache_info()._asdict() for name, render in _renderers.items()}
+
+
+def clear():
+    for render in _renderers.values():
+        render.cache_clear()
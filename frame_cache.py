@@ -0,0 +1,87 @@
+# Persistent on-disk cache for the merged DataFrames the dashboards build.
+#
+# Each frame is written once as a columnar Arrow IPC (Feather) file whose name
+# carries a SHA-256 digest of the source CSVs it was built from.  A warm start
+# reads that single file instead of re-running read_csv / melt / to_numeric /
+# merge, and editing any source file changes the digest, so the next start
+# rebuilds the frame and replaces the stale entry automatically.
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (backs DataFrame.to_feather / read_feather)
+except ImportError:
+    pyarrow = None
+
+CACHE_DIR = os.environ.get(
+    'IMO_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+)
+# Set IMO_CACHE=0 to always rebuild from the CSVs
+CACHE_ENABLED = os.environ.get('IMO_CACHE', '1') != '0'
+
+# Without pyarrow we still cache, just as a pickle instead of Feather
+CACHE_FORMAT = 'feather' if pyarrow is not None else 'pkl'
+
+
+def source_digest(sources, version=''):
+    # Hash file names and contents, plus anything else that changes the
+    # built frame (builder version, pandas version for the on-disk format)
+    digest = hashlib.sha256(f'{version}|{pd.__version__}'.encode())
+    for path in sources:
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _read(path):
+    if CACHE_FORMAT == 'feather':
+        return pd.read_feather(path)
+    return pd.read_pickle(path)
+
+
+def _write(df, path):
+    # Write to a temp file and rename so concurrent workers never read a
+    # half-written cache entry
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    if CACHE_FORMAT == 'feather':
+        df.to_feather(tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def cached_frame(name, sources, build, version=''):
+    if not CACHE_ENABLED:
+        return build().reset_index(drop=True)
+
+    digest = source_digest(sources, version)
+    path = os.path.join(CACHE_DIR, f'{name}-{digest}.{CACHE_FORMAT}')
+
+    if os.path.exists(path):
+        try:
+            return _read(path)
+        except Exception:
+            # Truncated or unreadable entry: fall through and rebuild it
+            pass
+
+    # Feather only stores a default RangeIndex
+    df = build().reset_index(drop=True)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write(df, path)
+        # Drop entries built from older versions of the sources
+        for stale in glob.glob(os.path.join(CACHE_DIR, f'{name}-*.{CACHE_FORMAT}')):
+            if stale != path:
+                os.remove(stale)
+    except OSError:
+        # A read-only or full disk must not stop the dashboard from starting
+        pass
+
+    return df
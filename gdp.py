@@ -1,315 +1,132 @@
-import pandas as pd
+import functools
+
 import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash import Patch, dcc, html
+from dash.dependencies import Input, Output, State
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots  # Add this line
+from plotly.subplots import make_subplots
 
-# Initialize the Dash app
-app = dash.Dash(__name__)
+import clientside
+import figure_cache
+import imo_data
+import lean_payload
+import metrics
 
-# Load and process data
-def load_data():
-    results_df = pd.read_csv('datasets/country_results_df.csv')
-    gdp_df = pd.read_csv('support_datasets/GDP.csv')
-    
-    # Melt GDP data to convert years from columns to rows
-    gdp_melted = gdp_df.melt(
-        id_vars=['Country', 'Country Code'],
-        value_vars=[str(year) for year in range(1960, 2023)],
-        var_name='year',
-        value_name='GDP'
-    )
-    gdp_melted['year'] = pd.to_numeric(gdp_melted['year'])
-    
-    # Prepare results data
-    results_df['year'] = pd.to_numeric(results_df['year'])
-    medal_cols = ['awards_gold', 'awards_silver', 'awards_bronze']
-    for col in medal_cols:
-        results_df[col] = pd.to_numeric(results_df[col], errors='coerce').fillna(0)
-    results_df['total_medals'] = results_df[medal_cols].sum(axis=1)
-    
-    # Merge datasets
-    merged_df = pd.merge(
-        results_df[['country', 'year', 'total_medals']], 
-        gdp_melted[['Country', 'year', 'GDP']],
-        left_on=['country', 'year'],
-        right_on=['Country', 'year'],
-        how='inner'
-    )
-    
-    merged_df['GDP'] = pd.to_numeric(merged_df['GDP'], errors='coerce')
-    merged_df.dropna(subset=['GDP'], inplace=True)
-    
-    return merged_df
+# Component ids, namespaced so every dashboard can be hosted as a page of
+# one multi-page app (app.py) without colliding
+PREFIX = 'gdp'
+YEAR_SLIDER = f'{PREFIX}-year-slider'
+COUNTRY_DROPDOWN = f'{PREFIX}-country-dropdown'
+SCATTER_PLOT = f'{PREFIX}-scatter-plot'
+COUNTRY_DETAILS = f'{PREFIX}-country-details'
+COUNTRY_STATS = f'{PREFIX}-country-stats'
+CHART_DATA = f'{PREFIX}-chart-data'
+SHOWN_YEAR = f'{PREFIX}-shown-year'
+
+# Data is loaded on first use, not at import, so hosting this page costs
+# nothing until it is visited
+def merged():
+    return imo_data.get('gdp_merged')
 
-# Load the data
-df = load_data()
+def index():
+    return imo_data.get('gdp_index')
 
-# Custom CSS styling
-app.layout = html.Div([
-    # Header section
-    html.Div([
-        html.H1("GDP vs IMO Medals Analysis (1960-2022)", 
-                style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': 30}),
-        html.P("Explore the relationship between country GDP and IMO performance over time", 
-               style={'textAlign': 'center', 'color': '#7f8c8d'})
-    ], style={'marginBottom': 40}),
+def trendlines():
+    return imo_data.get('gdp_trendlines')
+
+# Page layout; Dash pages passes the URL query parameters, which are unused
+def layout(**query_parameters):
+    df = merged()
+    children = [
+        # Header section
+        html.Div([
+            html.H1("GDP vs IMO Medals Analysis (1960-2022)", 
+                    style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': 30}),
+            html.P("Explore the relationship between country GDP and IMO performance over time", 
+                   style={'textAlign': 'center', 'color': '#7f8c8d'})
+        ], style={'marginBottom': 40}),
     
-    # Controls section
-    html.Div([
-        # Year selector
+        # Controls section
         html.Div([
-            html.Label("Select Year:", style={'fontWeight': 'bold', 'color': '#2c3e50'}),
-            dcc.Slider(
-                id='year-slider',
-                min=df['year'].min(),
-                max=df['year'].max(),
-                value=df['year'].max(),
-                marks={str(year): str(year) for year in df['year'].unique()},
-                step=None
-            )
-        ], style={'width': '100%', 'marginBottom': 30}),
+            # Year selector
+            html.Div([
+                html.Label("Select Year:", style={'fontWeight': 'bold', 'color': '#2c3e50'}),
+                dcc.Slider(
+                    id=YEAR_SLIDER,
+                    min=df['year'].min(),
+                    max=df['year'].max(),
+                    value=df['year'].max(),
+                    marks=lean_payload.slider_marks(df['year'].unique()),
+                    step=None
+                )
+            ], style={'width': '100%', 'marginBottom': 30}),
         
-        # Country selector
-        html.Div([
-            html.Label("Select Country:", style={'fontWeight': 'bold', 'color': '#2c3e50'}),
-            dcc.Dropdown(
-                id='country-dropdown',
-                style={'width': '50%', 'marginBottom': 20}
-            )
-        ])
-    ], style={'marginBottom': 30}),
+            # Country selector
+            html.Div([
+                html.Label("Select Country:", style={'fontWeight': 'bold', 'color': '#2c3e50'}),
+                dcc.Dropdown(
+                    id=COUNTRY_DROPDOWN,
+                    style={'width': '50%', 'marginBottom': 20}
+                )
+            ])
+        ], style={'marginBottom': 30}),
     
-    # Visualization section
-    html.Div([
-        # Left column - Scatter plot
+        # Visualization section
         html.Div([
-            dcc.Graph(id='scatter-plot')
-        ], style={'width': '60%', 'display': 'inline-block'}),
+            # Left column - Scatter plot
+            html.Div([
+                dcc.Graph(id=SCATTER_PLOT)
+            ], style={'width': '60%', 'display': 'inline-block'}),
         
-        # Right column - Country details and stats
-        html.Div([
-            dcc.Graph(id='country-details'),
-            html.Div(id='country-stats', style={'padding': '20px', 'backgroundColor': '#f8f9fa'})
-        ], style={'width': '40%', 'display': 'inline-block', 'verticalAlign': 'top'})
-    ], style={'display': 'flex'})
-], style={'padding': '20px', 'fontFamily': 'Arial'})
+            # Right column - Country details and stats
+            html.Div([
+                dcc.Graph(id=COUNTRY_DETAILS),
+                html.Div(id=COUNTRY_STATS, style={'padding': '20px', 'backgroundColor': '#f8f9fa'})
+            ], style={'width': '40%', 'display': 'inline-block', 'verticalAlign': 'top'})
+        ], style={'display': 'flex'})
+    ]
+    if clientside.ENABLED:
+        # Ship the rows once and filter, highlight and rank in the browser
+        children.append(clientside.store(CHART_DATA, clientside_data()))
+    else:
+        # The year of the scatter the browser shows, written by update_graphs
+        children.append(dcc.Store(id=SHOWN_YEAR))
+    return html.Div(children, style={'padding': '20px', 'fontFamily': 'Arial'})
 
 # Callback to update country dropdown based on year
-@app.callback(
-    [Output('country-dropdown', 'options'),
-     Output('country-dropdown', 'value')],
-    [Input('year-slider', 'value')]
-)
 def update_country_dropdown(selected_year):
-    available_countries = df[df['year'] == selected_year]['Country'].unique()
+    available_countries = index().countries(selected_year)
     options = [{'label': country, 'value': country} for country in available_countries]
     return options, available_countries[0]
 
-# Callback to update graphs
-@app.callback(
-    [Output('scatter-plot', 'figure'),
-     Output('country-details', 'figure'),
-     Output('country-stats', 'children')],
-    [Input('year-slider', 'value'),
-     Input('country-dropdown', 'value')]
-)
-def update_graphs(selected_year, selected_country):
-    # Filter data for selected year
-    year_data = df[df['year'] == selected_year]
-    
-    # Create scatter plot
-    scatter_fig = px.scatter(
-        year_data,
-        x='GDP',
-        y='total_medals',
-        title=f'GDP vs Total Medals Distribution ({selected_year})',
-        hover_data=['Country'],
-        log_x=True,
-        size='total_medals',
-        color='total_medals',
-        labels={'GDP': 'GDP (USD)', 'total_medals': 'Total Medals'},
-        template='plotly_white'
-    )
-    
-    # Add trendline
-    scatter_fig.add_traces(px.scatter(year_data, x='GDP', y='total_medals', trendline="ols").data)
-    
-    # Highlight selected country
-    country_data = year_data[year_data['Country'] == selected_country]
-    scatter_fig.add_trace(
-        go.Scatter(
-            x=[country_data['GDP'].iloc[0]],
-            y=[country_data['total_medals'].iloc[0]],
-            mode='markers+text',
-            marker=dict(size=20, color='#e74c3c', symbol='star'),
-            text=[selected_country],
-            textposition="top center",
-            name=selected_country,
-            showlegend=False,  # Add this line to hide from legend
-            hovertemplate=(
-                "<b>%{text}</b><br>" +
-                "GDP: $%{x:,.0f}<br>" +
-                "Medals: %{y}<br>" +
-                "<extra></extra>"
-            )
-        )
-    )
-    
-    # Update scatter plot layout
-    scatter_fig.update_layout(
-        title_x=0.5,
-        plot_bgcolor='rgba(240,240,240,0.2)',
-        paper_bgcolor='white',
-        hoverlabel=dict(bgcolor="white"),
-        hovermode='closest'
-    )
-    
-    # Create bar chart
-    bar_fig = go.Figure()
-    bar_fig.add_trace(go.Bar(
-        x=['GDP (Billions)', 'Total Medals'],
-        y=[country_data['GDP'].iloc[0]/1e9, country_data['total_medals'].iloc[0]],
-        marker_color=['#3498db', '#e74c3c'],
-        text=[f'${country_data["GDP"].iloc[0]/1e9:,.1f}B', 
-              f'{country_data["total_medals"].iloc[0]:.0f}'],
-        textposition='auto',
-    ))
-    
-    bar_fig.update_layout(
-        title=f'{selected_country} Statistics ({selected_year})',
-        plot_bgcolor='rgba(240,240,240,0.2)',
-        paper_bgcolor='white',
-        showlegend=False,
-        height=400
-    )
-    
-    # Calculate rankings
-    total_countries = len(year_data)
-    gdp_rank = year_data.sort_values('GDP', ascending=False)['Country'].tolist().index(selected_country) + 1
-    medals_rank = year_data.sort_values('total_medals', ascending=False)['Country'].tolist().index(selected_country) + 1# filepath: c:\Users\ice\Documents\courseworks\dataviz\comp4010_project1\demographic.py
-import pandas as pd
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import plotly.express as px
-import plotly.graph_objects as go
-
-# Initialize the Dash app
-app = dash.Dash(__name__)
+# Callback to update graphs; `shown_year` is the year of the scatter
+# currently in the browser, None before the first render
+def update_graphs(selected_year, selected_country, shown_year=None):
+    base = render_year(selected_year)
+    highlight = highlight_trace(selected_year, selected_country)
+    time_series, stats_card = render_country(selected_year, selected_country)
 
-# Load and process data
-def load_data():
-    results_df = pd.read_csv('datasets/country_results_df.csv')
-    gdp_df = pd.read_csv('support_datasets/GDP.csv')
-    
-    # Melt GDP data to convert years from columns to rows
-    gdp_melted = gdp_df.melt(
-        id_vars=['Country', 'Country Code'],
-        value_vars=[str(year) for year in range(1960, 2023)],
-        var_name='year',
-        value_name='GDP'
-    )
-    gdp_melted['year'] = pd.to_numeric(gdp_melted['year'])
-    
-    # Prepare results data
-    results_df['year'] = pd.to_numeric(results_df['year'])
-    medal_cols = ['awards_gold', 'awards_silver', 'awards_bronze']
-    for col in medal_cols:
-        results_df[col] = pd.to_numeric(results_df[col], errors='coerce').fillna(0)
-    results_df['total_medals'] = results_df[medal_cols].sum(axis=1)
-    
-    # Merge datasets
-    merged_df = pd.merge(
-        results_df[['country', 'year', 'total_medals']], 
-        gdp_melted[['Country', 'year', 'GDP']],
-        left_on=['country', 'year'],
-        right_on=['Country', 'year'],
-        how='inner'
-    )
-    
-    merged_df['GDP'] = pd.to_numeric(merged_df['GDP'], errors='coerce')
-    merged_df.dropna(subset=['GDP'], inplace=True)
-    
-    return merged_df
+    # The browser already shows this year's base scatter (markers, trendline,
+    # layout): only move the highlight trace on the client.  On first load
+    # and on navigation to the page the dropdown alone triggers this before
+    # any scatter exists, so the full figure is sent.
+    if shown_year == selected_year:
+        scatter_patch = Patch()
+        # The highlight is always the trace right after the base traces
+        highlight_index = len(base['data'])
+        for key in ('x', 'y', 'text', 'name'):
+            scatter_patch['data'][highlight_index][key] = highlight[key]
+        return scatter_patch, time_series, stats_card, dash.no_update
 
-# Load the data
-df = load_data()
-
-# Custom CSS styling
-app.layout = html.Div([
-    # Header section
-    html.Div([
-        html.H1("GDP vs IMO Medals Analysis (1960-2022)", 
-                style={'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': 30}),
-        html.P("Explore the relationship between country GDP and IMO performance over time", 
-               style={'textAlign': 'center', 'color': '#7f8c8d'})
-    ], style={'marginBottom': 40}),
-    
-    # Controls section
-    html.Div([
-        # Year selector
-        html.Div([
-            html.Label("Select Year:", style={'fontWeight': 'bold', 'color': '#2c3e50'}),
-            dcc.Slider(
-                id='year-slider',
-                min=df['year'].min(),
-                max=df['year'].max(),
-                value=df['year'].max(),
-                marks={str(year): str(year) for year in df['year'].unique()},
-                step=None
-            )
-        ], style={'width': '100%', 'marginBottom': 30}),
-        
-        # Country selector
-        html.Div([
-            html.Label("Select Country:", style={'fontWeight': 'bold', 'color': '#2c3e50'}),
-            dcc.Dropdown(
-                id='country-dropdown',
-                style={'width': '50%', 'marginBottom': 20}
-            )
-        ])
-    ], style={'marginBottom': 30}),
-    
-    # Visualization section
-    html.Div([
-        # Left column - Scatter plot
-        html.Div([
-            dcc.Graph(id='scatter-plot')
-        ], style={'width': '60%', 'display': 'inline-block'}),
-        
-        # Right column - Country details and stats
-        html.Div([
-            dcc.Graph(id='country-details'),
-            html.Div(id='country-stats', style={'padding': '20px', 'backgroundColor': '#f8f9fa'})
-        ], style={'width': '40%', 'display': 'inline-block', 'verticalAlign': 'top'})
-    ], style={'display': 'flex'})
-], style={'padding': '20px', 'fontFamily': 'Arial'})
-
-# Callback to update country dropdown based on year
-@app.callback(
-    [Output('country-dropdown', 'options'),
-     Output('country-dropdown', 'value')],
-    [Input('year-slider', 'value')]
-)
-def update_country_dropdown(selected_year):
-    available_countries = df[df['year'] == selected_year]['Country'].unique()
-    options = [{'label': country, 'value': country} for country in available_countries]
-    return options, available_countries[0]
+    scatter_fig = dict(base, data=base['data'] + [highlight])
+    return scatter_fig, time_series, stats_card, selected_year
 
-# Callback to update graphs
-@app.callback(
-    [Output('scatter-plot', 'figure'),
-     Output('country-details', 'figure'),
-     Output('country-stats', 'children')],
-    [Input('year-slider', 'value'),
-     Input('country-dropdown', 'value')]
-)
-def update_graphs(selected_year, selected_country):
+# Base scatter plot for one year, without the highlighted country
+@figure_cache.memoize_figures('gdp_year')
+def render_year(selected_year):
     # Filter data for selected year
-    year_data = df[df['year'] == selected_year]
+    year_data = index().year(selected_year)
     
     # Create scatter plot
     scatter_fig = px.scatter(
@@ -322,31 +139,12 @@ def update_graphs(selected_year, selected_country):
         size='total_medals',
         color='total_medals',
         labels={'GDP': 'GDP (USD)', 'total_medals': 'Total Medals'},
-        template='plotly_white'
+        template='plotly_white',
+        render_mode='webgl' if lean_payload.ENABLED else 'auto'
     )
     
-    # Add trendline
-    scatter_fig.add_traces(px.scatter(year_data, x='GDP', y='total_medals', trendline="ols").data)
-    
-    # Highlight selected country
-    country_data = year_data[year_data['Country'] == selected_country]
-    scatter_fig.add_trace(
-        go.Scatter(
-            x=[country_data['GDP'].iloc[0]],
-            y=[country_data['total_medals'].iloc[0]],
-            mode='markers+text',
-            marker=dict(size=20, color='#e74c3c', symbol='star'),
-            text=[selected_country],
-            textposition="top center",
-            name=selected_country,
-            hovertemplate=(
-                "<b>%{text}</b><br>" +
-                "GDP: $%{x:,.0f}<br>" +
-                "Medals: %{y}<br>" +
-                "<extra></extra>"
-            )
-        )
-    )
+    # Add trendline from the precomputed per-year fit
+    scatter_fig.add_trace(trendline_trace(selected_year))
     
     # Update scatter plot layout
     scatter_fig.update_layout(
@@ -365,26 +163,55 @@ def update_graphs(selected_year, selected_country):
         margin=dict(t=150)  # Adds more space at the top for the legend
     )
     
-    # Create bar chart
-    bar_fig = go.Figure()
-    bar_fig.add_trace(go.Bar(
-        x=['GDP (Billions)', 'Total Medals'],
-        y=[country_data['GDP'].iloc[0]/1e9, country_data['total_medals'].iloc[0]],
-        marker_color=['#3498db', '#e74c3c'],
-        text=[f'${country_data["GDP"].iloc[0]/1e9:,.1f}B', 
-              f'{country_data["total_medals"].iloc[0]:.0f}'],
-        textposition='auto',
-    ))
-    
-    bar_fig.update_layout(
-        title=f'{selected_country} Statistics ({selected_year})',
-        plot_bgcolor='rgba(240,240,240,0.2)',
-        paper_bgcolor='white',
+    return scatter_fig
+
+# OLS trendline for one year, drawn from the fit computed at load time
+def trendline_trace(selected_year):
+    params = trendlines().loc[selected_year]
+    x, y = imo_data.trendline_points(params)
+    x_term = 'log10(GDP)' if params['log_x'] else 'GDP'
+    # WebGL like the markers in lean payload mode
+    trace = go.Scattergl if lean_payload.ENABLED else go.Scatter
+    return trace(
+        x=x,
+        y=y,
+        mode='lines',
+        line=dict(color='#636efa'),
         showlegend=False,
-        height=400
+        hovertemplate=(
+            "<b>OLS trendline</b><br>" +
+            f"total_medals = {params['slope']:g} * {x_term} + {params['intercept']:g}<br>" +
+            f"R<sup>2</sup>={params['r2']:f}<br><br>" +
+            "GDP=%{x}<br>total_medals=%{y} <b>(trend)</b><extra></extra>"
+        )
     )
+
+# Star marker for the selected country, as a plain trace dict
+def highlight_trace(selected_year, selected_country):
+    country_data = index().row(selected_year, selected_country)
+    return go.Scatter(
+        x=[country_data['GDP'].iloc[0]],
+        y=[country_data['total_medals'].iloc[0]],
+        mode='markers+text',
+        marker=dict(size=20, color='#e74c3c', symbol='star'),
+        text=[selected_country],
+        textposition="top center",
+        name=selected_country,
+        hovertemplate=(
+            "<b>%{text}</b><br>" +
+            "GDP: $%{x:,.0f}<br>" +
+            "Medals: %{y}<br>" +
+            "<extra></extra>"
+        )
+    ).to_plotly_json()
+
+# Time series and stats card for one (year, country)
+@figure_cache.memoize_figures('gdp_country')
+def render_country(selected_year, selected_country):
+    country_data = index().row(selected_year, selected_country)
+
     # Add time series chart to country details
-    years_data = df[df['Country'] == selected_country].sort_values('year')
+    years_data = index().country(selected_country)
     
     # Create time series subplot for country details
     time_series = make_subplots(
@@ -427,10 +254,10 @@ def update_graphs(selected_year, selected_country):
         title=f'{selected_country} Historical Trends',
         title_x=0.5
     )
-     # Calculate rankings (move this before stats_card creation)
-    total_countries = len(year_data)
-    gdp_rank = year_data.sort_values('GDP', ascending=False)['Country'].tolist().index(selected_country) + 1
-    medals_rank = year_data.sort_values('total_medals', ascending=False)['Country'].tolist().index(selected_country) + 1
+    # Rankings are precomputed per year by the data layer
+    total_countries = country_data['participants'].iloc[0]
+    gdp_rank = country_data['gdp_rank'].iloc[0]
+    medals_rank = country_data['medals_rank'].iloc[0]
     # Create stats card with historical context
     stats_card = html.Div([
         html.H4('Country Performance', style={'marginBottom': '15px', 'color': '#2c3e50'}),
@@ -454,7 +281,67 @@ def update_graphs(selected_year, selected_country):
         ], style={'backgroundColor': 'white', 'padding': '15px', 'borderRadius': '5px'})
     ])
     
-    return scatter_fig, time_series, stats_card
+    return time_series, stats_card
+
+# Pre-render the latest year for every country available in it
+def warm_figure_cache():
+    latest_year = index().years()[-1]
+    render_year(latest_year)
+    figure_cache.warm(render_country, [(latest_year, country) for country in index().countries(latest_year)])
+
+# Labels for the browser-side rendering in client-side mode
+CLIENTSIDE_CONFIG = {
+    'x_label': 'GDP (USD)',
+    'hover_x': 'GDP',
+    'scatter_title': 'GDP vs Total Medals Distribution',
+    'series_title': 'GDP Over Time',
+    'series_name': 'GDP',
+    'series_scale': 1e9,
+    'series_hover': "Year: %{x}<br>GDP: $%{y:.1f}B<extra></extra>",
+    'rank_label': 'Current GDP Rank: ',
+}
+
+# Column data for the browser, built once per data generation (see
+# imo_data.reload)
+def clientside_data():
+    return _clientside_data(imo_data.generation())
+
+@functools.lru_cache(maxsize=1)
+def _clientside_data(generation):
+    return clientside.payload(merged(), 'GDP', 'gdp_rank', trendlines(), CLIENTSIDE_CONFIG)
+
+# Attach the callbacks to `target`: a standalone Dash app, or the dash module
+# itself (dash.callback) when the dashboard is hosted as a page
+def register_callbacks(target):
+    if clientside.ENABLED:
+        clientside.register(target, CHART_DATA, YEAR_SLIDER, COUNTRY_DROPDOWN,
+                            [SCATTER_PLOT, COUNTRY_DETAILS, COUNTRY_STATS])
+    else:
+        target.callback(
+            [Output(COUNTRY_DROPDOWN, 'options'),
+             Output(COUNTRY_DROPDOWN, 'value')],
+            [Input(YEAR_SLIDER, 'value')]
+        )(update_country_dropdown)
+        target.callback(
+            [Output(SCATTER_PLOT, 'figure'),
+             Output(COUNTRY_DETAILS, 'figure'),
+             Output(COUNTRY_STATS, 'children'),
+             Output(SHOWN_YEAR, 'data')],
+            [Input(YEAR_SLIDER, 'value'),
+             Input(COUNTRY_DROPDOWN, 'value')],
+            [State(SHOWN_YEAR, 'data')]
+        )(update_graphs)
+
+    if figure_cache.WARM_FIGURE_CACHE and not clientside.ENABLED:
+        warm_figure_cache()
+
+# Standalone single-dashboard app
+def create_app():
+    app = dash.Dash(__name__)
+    app.layout = layout
+    register_callbacks(app)
+    metrics.instrument(app)
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, port=8051)
\ No newline at end of file
+    create_app().run(debug=True, port=8051)
\ No newline at end of file
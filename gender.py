@@ -1,70 +1,32 @@
-import pandas as pd
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
 import plotly.express as px
 import plotly.graph_objects as go
 
-# Load and process data
-def load_data():
-    # Load datasets
-    gii_df = pd.read_csv('support_datasets/Gender Inequality Index.csv')
-    results_df = pd.read_csv('datasets/country_results_df.csv')
-    
-    # Melt GII data to convert years to rows
-    gii_melted = gii_df.melt(
-        id_vars=['Country', 'Continent', 'Human Development Groups'],
-        value_vars=[col for col in gii_df.columns if 'Gender Inequality Index' in col],
-        var_name='Year',
-        value_name='GII'
-    )
-    # Extract year from column name
-    gii_melted['Year'] = gii_melted['Year'].str.extract('(\d{4})').astype(int)
-    
-    # Process results data
-    results_df['year'] = pd.to_numeric(results_df['year'])
-    results_df['team_size_female'] = pd.to_numeric(results_df['team_size_female'])
-    results_df['team_size_all'] = pd.to_numeric(results_df['team_size_all'])
-    results_df['female_ratio'] = results_df['team_size_female'] / results_df['team_size_all']
-    
-    # Calculate total medals
-    medal_cols = ['awards_gold', 'awards_silver', 'awards_bronze']
-    for col in medal_cols:
-        results_df[col] = pd.to_numeric(results_df[col], errors='coerce').fillna(0)
-    results_df['total_medals'] = results_df[medal_cols].sum(axis=1)
-    
-    # Merge datasets
-    merged_df = pd.merge(
-        results_df,
-        gii_melted,
-        left_on=['country', 'year'],
-        right_on=['Country', 'Year'],
-        how='inner'
-    )
-    
-    development_order = ['Very High', 'High', 'Medium', 'Low']
-    merged_df['Human Development Groups'] = pd.Categorical(
-        merged_df['Human Development Groups'],
-        categories=development_order,
-        ordered=True
-    )
-    
-    return merged_df
+import figure_cache
+import imo_data
+import metrics
 
-# Initialize Dash app
-app = dash.Dash(__name__)
+# Component ids, namespaced so the dashboard can be hosted as a page of the
+# multi-page app (app.py)
+PREFIX = 'gender'
+VIZ_TYPE = f'{PREFIX}-viz-type'
+MAIN_GRAPH = f'{PREFIX}-main-graph'
 
-# Load data
-df = load_data()
+# The four views; any other value (e.g. the initial 'gii_medals') falls back
+# to the GII trend
+VIEWS = ('female_trend', 'continent_trend', 'gii_trend', 'gender_trend')
+DEFAULT_VIEW = 'gii_trend'
 
 # App layout
-app.layout = html.Div([
+layout = html.Div([
     html.H1("Gender Inequality Index and IMO Performance Analysis"),
     
     html.Div([
         html.Label("Select Visualization:"),
             dcc.Dropdown(
-            id='viz-type',
+            id=VIZ_TYPE,
             options=[
                 {'label': 'Female Participation Trend', 'value': 'female_trend'},
                 {'label': 'Female Participation by Continent', 'value': 'continent_trend'},
@@ -76,19 +38,24 @@ app.layout = html.Div([
     ]),
     
     html.Div([
-        dcc.Graph(id='main-graph')
+        dcc.Graph(id=MAIN_GRAPH)
     ])
 ])
 
-# Callback to update graph
-@app.callback(
-    Output('main-graph', 'figure'),
-    [Input('viz-type', 'value')]
-)
-def update_graph(viz_type):  
+# Callback to update graph: the data never changes, so each view is built
+# once and then served from memory
+def update_graph(viz_type):
+    return render_view(viz_type if viz_type in VIEWS else DEFAULT_VIEW)
+
+# Aggregates and figure for one view, serialized once
+@figure_cache.memoize_figures('gender_view')
+def render_view(viz_type):
+    # Pre-aggregated rollups, loaded on first use, not at import
+    cube = imo_data.get('gii_cube')
+
     if viz_type == 'female_trend':
         # Calculate average female ratio by year and development group
-        yearly_avg = df.groupby(['Year', 'Human Development Groups'])['female_ratio'].mean().reset_index()
+        yearly_avg = cube.query(['Year', 'Human Development Groups'], {'female_ratio': 'mean'})
         
         fig = px.line(
             yearly_avg,
@@ -99,7 +66,7 @@ def update_graph(viz_type):
         )
     elif viz_type == 'gender_trend':
         # Load timeline data
-        timeline_df = pd.read_csv('datasets/timeline_df.csv')
+        timeline_df = imo_data.get('timeline')
         
         # Create figure with secondary y-axis
         fig = go.Figure()
@@ -143,11 +110,11 @@ def update_graph(viz_type):
         fig.update_xaxes(rangeslider_visible=True)
     elif viz_type == 'continent_trend':
         # Add new visualization for continent-based analysis
-        yearly_continent = df.groupby(['Year', 'Continent']).agg({
+        yearly_continent = cube.query(['Year', 'Continent'], {
             'female_ratio': 'mean',
             'GII': 'mean',
             'total_medals': 'sum'
-        }).reset_index()
+        })
         
         fig = px.line(
             yearly_continent,
@@ -163,7 +130,7 @@ def update_graph(viz_type):
         fig.update_xaxes(rangeslider_visible=True)
     else:  # gii_trend
         # Calculate average GII by year and development group
-        yearly_gii = df.groupby(['Year', 'Human Development Groups'])['GII'].mean().reset_index()
+        yearly_gii = cube.query(['Year', 'Human Development Groups'], {'GII': 'mean'})
         
         fig = px.line(
             yearly_gii,
@@ -181,5 +148,28 @@ def update_graph(viz_type):
     
     return fig
 
+# Build every view up front
+def warm_figure_cache():
+    figure_cache.warm(render_view, [(view,) for view in VIEWS])
+
+# Attach the callback to `target`: a standalone Dash app, or the dash module
+# itself (dash.callback) when the dashboard is hosted as a page
+def register_callbacks(target):
+    target.callback(
+        Output(MAIN_GRAPH, 'figure'),
+        [Input(VIZ_TYPE, 'value')]
+    )(update_graph)
+
+    if figure_cache.WARM_FIGURE_CACHE:
+        warm_figure_cache()
+
+# Standalone single-dashboard app
+def create_app():
+    app = dash.Dash(__name__)
+    app.layout = layout
+    register_callbacks(app)
+    metrics.instrument(app)
+    return app
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
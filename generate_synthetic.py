@@ -0,0 +1,362 @@
+# Synthetic, scaled-up copies of the data files, for stress-testing the
+# loaders, callbacks and benchmarks on inputs far larger than the real ones.
+#
+#     python generate_synthetic.py --scale 100                # -> synthetic_data/
+#     python generate_synthetic.py --scale 10 --year-scale 10 --output big_data
+#     IMO_DATA_DIR=synthetic_data python benchmark.py --quick
+#
+# Every country becomes `scale` teams ("Japan", "Japan 2", "Japan 3", ...)
+# and every year `year-scale` consecutive years, so each file grows by about
+# scale x year-scale.  A synthetic row starts from the real row it copies:
+# each partial score on a problem may move a point, and the team's problem
+# totals and medal counts move by the same amounts; ranks are recomputed
+# within the synthetic year and awards against the real year's medal cutoffs.
+# The files keep their columns, their relationships and their NA conventions
+# (NA for a missing score, rank, team size or medal count; an empty award,
+# leader or indicator cell).
+#
+# In the indicator files a copy gets its own ISO3 code ("JPN2") and the name
+# the results give it, so copies join like the originals.  Teams that only
+# imo_data's code aliases know (USSR, Yugoslavia, Taiwan, ...) have an ISO3
+# code in the first copy only.
+#
+# The output depends only on the source files, the options and --seed.
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import imo_data
+from contestant_data import PROBLEM_COLS
+
+DEFAULT_OUTPUT = 'synthetic_data'
+DEFAULT_SEED = 4010
+
+# Chance that a partial score on a problem moves a point (either way); full
+# and zero scores, most of them, stay put so the medal and mention counts hold
+SCORE_JITTER = 0.3
+# Spread, on a log scale, of a copied country's indicator values around the
+# original's, and of each value around its country's
+COUNTRY_SPREAD = 0.1
+VALUE_NOISE = 0.02
+
+MEDALS = [('Gold medal', 'awards_gold'), ('Silver medal', 'awards_silver'), ('Bronze medal', 'awards_bronze'),
+          ('Honourable mention', 'awards_honorable_mentions')]
+NO_AWARD = len(MEDALS)
+HONOURABLE_MENTION = 3
+
+
+def copy_name(name, copy):
+    return name if copy == 0 else f'{name} {copy + 1}'
+
+
+def copy_code(code, copy):
+    return code if copy == 0 else f'{code}{copy + 1}'
+
+
+# Position of every real year in the synthetic calendar: year `first_year`
+# stays put, later years spread out to make room for the `year_scale`
+# consecutive copies of each
+def stretch_year(year, first_year, year_scale, offset=0):
+    return first_year + (year - first_year) * year_scale + offset
+
+
+# Nullable integers for the CSV, NA where `values` is NaN
+def nullable(values):
+    return pd.array(np.asarray(values, dtype='float64'), dtype='Int64')
+
+
+# Medal index of each award label (NO_AWARD for none, or a special prize alone)
+def award_codes(awards):
+    codes = np.full(len(awards), NO_AWARD, dtype='int64')
+    for code, (label, _) in reversed(list(enumerate(MEDALS))):
+        codes[awards.str.startswith(label).to_numpy()] = code
+    return codes
+
+
+def append_csv(df, path, header):
+    df.to_csv(path, mode='w' if header else 'a', header=header, index=False, na_rep='NA')
+
+
+class Generator:
+    def __init__(self, source, scale, year_scale, seed):
+        self.source = source
+        self.scale = scale
+        self.year_scale = year_scale
+        self.rng = np.random.default_rng(seed)
+
+        self.results = pd.read_csv(os.path.join(source, imo_data.RESULTS_CSV))
+        self.contestants = pd.read_csv(os.path.join(source, imo_data.INDIVIDUAL_CSV))
+        self.timeline = pd.read_csv(os.path.join(source, imo_data.TIMELINE_CSV))
+        # Empty text cells stay empty
+        self.results[['leader', 'deputy_leader']] = self.results[['leader', 'deputy_leader']].fillna('')
+        self.contestants['award'] = self.contestants['award'].fillna('')
+        self.first_year = int(min(self.results['year'].min(), self.contestants['year'].min()))
+
+        # Every team name, with its copies' names: (copies, countries)
+        countries = sorted(set(self.results['country']) | set(self.contestants['country']))
+        self.country_codes = {country: i for i, country in enumerate(countries)}
+        self.country_names = np.array([[copy_name(country, copy) for country in countries]
+                                       for copy in range(scale)], dtype=object)
+
+        # Given and family names of the people in the files, recombined
+        people = pd.concat([self.contestants['contestant'], self.results['leader'],
+                            self.results['deputy_leader']]).dropna().astype(str).str.split()
+        people = people[people.str.len() >= 2]
+        self.given_names = np.asarray(people.str[0].unique(), dtype=object)
+        self.family_names = np.asarray(people.str[-1].unique(), dtype=object)
+
+    def people(self, count):
+        given = self.given_names[self.rng.integers(len(self.given_names), size=count)]
+        family = self.family_names[self.rng.integers(len(self.family_names), size=count)]
+        return given + ' ' + family
+
+    def copies_of(self, countries):
+        codes = np.array([self.country_codes[country] for country in countries], dtype='int64')
+        return self.country_names[:, codes]
+
+    # ------------------------------------------------------------------
+    # Results and contestants
+    # ------------------------------------------------------------------
+
+    # Contestant and team rows of one synthetic year copied from the real
+    # year's `contestants` and `teams`
+    def synthetic_year(self, year, contestants, teams):
+        copies, rows, team_count = self.scale, len(contestants), len(teams)
+
+        scores = contestants[PROBLEM_COLS].to_numpy(dtype='float64')
+        # Highest score of each problem that year (7, or 0 for a problem not set)
+        top = np.nan_to_num(scores, nan=0).max(axis=0, initial=0)
+        steps = self.rng.choice([-1, 0, 1], size=(copies, rows, len(PROBLEM_COLS)),
+                                p=[SCORE_JITTER / 2, 1 - SCORE_JITTER, SCORE_JITTER / 2])
+        partial = (scores > 0) & (scores < top)
+        new_scores = np.where(partial, np.clip(scores + steps, 0, top), scores)
+        delta = np.nan_to_num(new_scores - scores, nan=0).astype('int64')
+        total = contestants['total'].to_numpy(dtype='int64') + delta.sum(axis=-1)
+
+        # Awards against the real year's lowest medalled totals
+        old_awards = award_codes(contestants['award'])
+        new_awards = np.full((copies, rows), NO_AWARD, dtype='int64')
+        for code in reversed(range(HONOURABLE_MENTION)):
+            awarded = contestants['total'].to_numpy()[old_awards == code]
+            if len(awarded):
+                new_awards[total >= awarded.min()] = code
+        if (old_awards == HONOURABLE_MENTION).any():
+            # A full score on some problem, or the real mention when the
+            # problem scores are unknown
+            unscored = np.isnan(scores).all(axis=1)
+            full_score = ((new_scores == top) & (top > 0)).any(axis=-1)
+            mention = full_score | (unscored & (old_awards == HONOURABLE_MENTION))
+            new_awards[(new_awards == NO_AWARD) & mention] = HONOURABLE_MENTION
+
+        # Ranks over every copy of the year; unranked contestants stay NA
+        ranked = np.broadcast_to(contestants['individual_rank'].notna().to_numpy(), (copies, rows))
+        ranked_totals = np.sort(total[ranked])
+        rank = np.where(ranked, len(ranked_totals) - np.searchsorted(ranked_totals, total, 'right') + 1, np.nan)
+
+        labels = np.array([label for label, _ in MEDALS] + [''], dtype=object)
+        contestant_rows = pd.DataFrame({
+            'year': year,
+            'contestant': self.people(copies * rows),
+            'country': self.copies_of(contestants['country']).ravel(),
+        })
+        new_scores = new_scores.reshape(-1, len(PROBLEM_COLS))
+        for p, col in enumerate(PROBLEM_COLS):
+            contestant_rows[col] = nullable(new_scores[:, p])
+        contestant_rows['total'] = total.ravel()
+        contestant_rows['individual_rank'] = nullable(rank.ravel())
+        contestant_rows['award'] = labels[new_awards.ravel()]
+        contestant_rows = contestant_rows.sort_values('total', ascending=False, kind='stable')
+
+        # Teams move by the sums of their contestants' changes
+        team_of = pd.Series(np.arange(team_count), index=teams['country']).reindex(contestants['country'])
+        team_of = team_of.fillna(-1).to_numpy(dtype='int64')
+        on_team = np.broadcast_to(team_of >= 0, (copies, rows))
+        cells = (np.arange(copies)[:, None] * team_count + team_of)[on_team]
+
+        def per_team(weights):
+            return np.bincount(cells, weights[on_team], copies * team_count).reshape(copies, team_count)
+
+        team_rows = pd.DataFrame({
+            'year': year,
+            'country': self.copies_of(teams['country']).ravel(),
+        })
+        for col in ['team_size_all', 'team_size_male', 'team_size_female']:
+            team_rows[col] = nullable(np.tile(teams[col].to_numpy(dtype='float64'), copies))
+        points = np.zeros((copies, team_count))
+        for p, col in enumerate(PROBLEM_COLS):
+            team_points = teams[col].to_numpy(dtype='float64') + per_team(delta[..., p])
+            team_rows[col] = nullable(team_points.ravel())
+            points += np.nan_to_num(team_points, nan=0)
+        for code, (_, col) in enumerate(MEDALS):
+            moved = per_team((new_awards == code).astype('int64')) - per_team(
+                np.broadcast_to(old_awards == code, (copies, rows)).astype('int64'))
+            team_rows[col] = nullable(np.maximum(teams[col].to_numpy(dtype='float64') + moved, 0).ravel())
+        for col in ['leader', 'deputy_leader']:
+            named = np.tile(teams[col].to_numpy() != '', copies)
+            team_rows[col] = np.where(named, self.people(copies * team_count), '')
+        team_rows = team_rows.iloc[np.argsort(-points.ravel(), kind='stable')]
+
+        return contestant_rows, team_rows
+
+    def write_results(self, output):
+        contestants_path = os.path.join(output, imo_data.INDIVIDUAL_CSV)
+        results_path = os.path.join(output, imo_data.RESULTS_CSV)
+        contestants_by_year = dict(tuple(self.contestants.groupby('year')))
+        teams_by_year = dict(tuple(self.results.groupby('year')))
+        empty_contestants, empty_teams = self.contestants.iloc[:0], self.results.iloc[:0]
+
+        header = True
+        # Newest year first, like the real files
+        for real_year in sorted(set(contestants_by_year) | set(teams_by_year), reverse=True):
+            contestants = contestants_by_year.get(real_year, empty_contestants).reset_index(drop=True)
+            teams = teams_by_year.get(real_year, empty_teams).reset_index(drop=True)
+            for offset in reversed(range(self.year_scale)):
+                year = stretch_year(real_year, self.first_year, self.year_scale, offset)
+                contestant_rows, team_rows = self.synthetic_year(year, contestants, teams)
+                append_csv(contestant_rows, contestants_path, header)
+                append_csv(team_rows, results_path, header)
+                header = False
+
+    def write_timeline(self, output):
+        timeline = self.timeline.sort_values('year', ascending=False)
+        rows = []
+        for _, edition in timeline.iterrows():
+            for offset in reversed(range(self.year_scale)):
+                year = stretch_year(int(edition['year']), self.first_year, self.year_scale, offset)
+                rows.append({
+                    'year': year,
+                    'country': copy_name(edition['country'], int(self.rng.integers(self.scale))),
+                    'city': edition['city'],
+                    **{col: edition[col] * self.scale
+                       for col in ['countries', 'all_contestant', 'male_contestant', 'female_contestant']},
+                    'start_date': f"{year}{edition['start_date'][4:]}",
+                    'end_date': f"{year}{edition['end_date'][4:]}",
+                })
+        df = pd.DataFrame(rows)
+        df.insert(0, 'edition', np.arange(len(df), 0, -1))
+        for col in ['countries', 'all_contestant', 'male_contestant', 'female_contestant']:
+            df[col] = nullable(df[col])
+        append_csv(df, os.path.join(output, imo_data.TIMELINE_CSV), True)
+
+    # ------------------------------------------------------------------
+    # Indicator files
+    # ------------------------------------------------------------------
+
+    # Name of a code's copies: the name the results give the country, so the
+    # results find the copies by name, or else the indicator file's own
+    def code_names(self):
+        data_dir, imo_data.DATA_DIR = imo_data.DATA_DIR, self.source
+        imo_data.clear('gdp', 'gii')
+        try:
+            name_codes = imo_data.country_name_codes()
+        finally:
+            imo_data.DATA_DIR = data_dir
+            imo_data.clear('gdp', 'gii')
+        names = {}
+        for name in sorted(self.country_codes):
+            names.setdefault(name_codes.get(name), name)
+        for name, code in name_codes.items():
+            names.setdefault(code, name)
+        names.pop(None, None)
+        return names, name_codes
+
+    # Copies of a wide indicator file: `year_columns` maps each year to its
+    # column and `key_columns(copy)` gives the copy's name and code columns
+    def write_indicator(self, path, df, year_columns, key_columns, round_to=None, upper=None):
+        years = sorted(year_columns)
+        values = df[[year_columns[year] for year in years]].apply(pd.to_numeric, errors='coerce')
+        values = np.repeat(values.to_numpy(dtype='float64'), self.year_scale, axis=1)
+        template = year_columns[years[0]]
+        columns = [template.replace(str(years[0]), str(stretch_year(year, self.first_year, self.year_scale, offset)))
+                   for year in years for offset in range(self.year_scale)]
+        first, last = df.columns.get_loc(year_columns[years[0]]), df.columns.get_loc(year_columns[years[-1]])
+        before, after = list(df.columns[:first]), list(df.columns[last + 1:])
+
+        for copy in range(self.scale):
+            spread = 0 if copy == 0 else self.rng.normal(0, COUNTRY_SPREAD, (len(df), 1))
+            copied = values * np.exp(spread + self.rng.normal(0, VALUE_NOISE, values.shape))
+            if upper is not None:
+                copied = np.minimum(copied, upper)
+            if round_to is not None:
+                copied = copied.round(round_to)
+            block = pd.concat([
+                df[before].reset_index(drop=True).assign(**key_columns(copy)),
+                pd.DataFrame(copied, columns=columns),
+                df[after].reset_index(drop=True),
+            ], axis=1)
+            block.to_csv(path, mode='w' if copy == 0 else 'a', header=copy == 0, index=False,
+                         float_format='%.12g')
+
+    def write_indicators(self, output):
+        names, name_codes = self.code_names()
+        os.makedirs(os.path.join(output, os.path.dirname(imo_data.GDP_CSV)), exist_ok=True)
+
+        def read(name):
+            return pd.read_csv(os.path.join(self.source, name), dtype=str, keep_default_na=False)
+
+        def coded_keys(df, name_col, code_col):
+            def keys(copy):
+                return {
+                    name_col: [copy_name(names.get(code, name), copy) if copy else name
+                               for name, code in zip(df[name_col], df[code_col])],
+                    code_col: [copy_code(code, copy) for code in df[code_col]],
+                }
+            return keys
+
+        gdp = read(imo_data.GDP_CSV)
+        self.write_indicator(os.path.join(output, imo_data.GDP_CSV), gdp,
+                             imo_data.year_columns(gdp), coded_keys(gdp, 'Country', 'Country Code'))
+
+        gii = read(imo_data.GII_CSV)
+        self.write_indicator(os.path.join(output, imo_data.GII_CSV), gii,
+                             imo_data.year_columns(gii, r'Gender Inequality Index \((\d{4})\)'),
+                             coded_keys(gii, 'Country', 'ISO3'), round_to=3, upper=1)
+
+        # Joined by name only
+        gdp_pc = read(imo_data.GDP_PER_CAPITA_CSV)
+
+        def per_capita_keys(copy):
+            return {
+                'Sr.No': np.arange(len(gdp_pc)) + copy * len(gdp_pc) + 1,
+                'Country': [copy_name(names.get(name_codes.get(name), name), copy) if copy else name
+                            for name in gdp_pc['Country']],
+            }
+
+        self.write_indicator(os.path.join(output, imo_data.GDP_PER_CAPITA_CSV), gdp_pc,
+                             imo_data.year_columns(gdp_pc), per_capita_keys)
+
+
+def generate(output, scale, year_scale=1, seed=DEFAULT_SEED, source=imo_data.DATA_DIR):
+    if scale < 1 or year_scale < 1:
+        raise ValueError('scale and year_scale must be at least 1')
+    if os.path.abspath(output) == os.path.abspath(source):
+        raise ValueError(f'Refusing to overwrite the source data in {source}')
+    os.makedirs(output, exist_ok=True)
+
+    generator = Generator(source, scale, year_scale, seed)
+    generator.write_results(output)
+    generator.write_timeline(output)
+    generator.write_indicators(output)
+    return generator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write scaled-up synthetic copies of the data files.')
+    parser.add_argument('--scale', type=int, default=10, help='teams per real country (default 10)')
+    parser.add_argument('--year-scale', type=int, default=1, help='years per real year (default 1)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'random seed (default {DEFAULT_SEED})')
+    parser.add_argument('--source', default=imo_data.DATA_DIR, help='data directory to copy (default: the real data)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f'output directory (default {DEFAULT_OUTPUT})')
+    args = parser.parse_args(argv)
+
+    generate(args.output, args.scale, args.year_scale, args.seed, args.source)
+    print(f'Wrote {args.scale * args.year_scale}x the data into {args.output}; '
+          f'point the dashboards at it with IMO_DATA_DIR={args.output}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+# Gunicorn settings for the dashboards (see wsgi.py):
+#
+#     IMO_DASHBOARD=gender IMO_WORKERS=4 IMO_THREADS=2 gunicorn -c gunicorn.conf.py
+import gc
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:server'
+bind = os.environ.get('IMO_BIND', '0.0.0.0:8050')
+
+# Worker processes and threads per worker; with more than one thread gunicorn
+# switches to its threaded (gthread) worker
+workers = int(os.environ.get('IMO_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('IMO_THREADS', '1'))
+
+# Import the app, and load its data, once in the master before forking
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything loaded so far into the permanent generation: the
+    # collector then never walks (and so never writes to) those objects in
+    # the workers, which keeps the shared pages from being copied
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Threads do not survive the fork, so each worker watches the source
+    # files itself (IMO_HOT_RELOAD=1, see hot_reload.py)
+    import hot_reload
+    if hot_reload.ENABLED:
+        hot_reload.start()
@@ -0,0 +1,124 @@
+# Hot reload of the source CSVs.
+#
+# With IMO_HOT_RELOAD=1 a background thread polls the files in data/ that the
+# registered datasets are built from.  When a file's mtime or size changes and
+# then holds still for one poll (so a file being copied in is not read half
+# written), its contents are hashed; if the hash differs, imo_data.reload()
+# rebuilds only the loaded datasets derived from that file, e.g. a new IMO
+# year in country_results_df.csv rebuilds the merged GDP views and re-splits
+# and refits just the years that changed.  The new datasets are swapped in
+# together while requests keep being served, and the figure caches move on to
+# the new data generation.  Files are compared with their state when the
+# loaded datasets were first built, so a change made before the watcher
+# starts is still picked up.
+#
+# Every process watches on its own: under gunicorn each worker starts its
+# watcher after the fork (see gunicorn.conf.py).
+import hashlib
+import logging
+import os
+import threading
+
+import figure_cache
+import imo_data
+
+ENABLED = os.environ.get('IMO_HOT_RELOAD', '0') == '1'
+# Seconds between polls
+INTERVAL = float(os.environ.get('IMO_HOT_RELOAD_INTERVAL', '2'))
+
+log = logging.getLogger(__name__)
+
+_watcher = None
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Every source file some dataset is built from, relative to DATA_DIR
+def watched_sources():
+    return sorted({source for entry in imo_data._registry.values() for source in entry['sources']})
+
+
+class SourceWatcher:
+    def __init__(self, sources=None, interval=INTERVAL):
+        self.sources = sources or watched_sources()
+        self.interval = interval
+        # The baseline is each file as the loaded datasets were built from it:
+        # one changed since then keeps its build-time stat, so the first polls
+        # pick the change up, and has no digest to match the new contents
+        current = {source: imo_data.source_stat(source) for source in self.sources}
+        built = imo_data.built_source_stats()
+        self._stats = {source: built.get(source, current[source]) for source in self.sources}
+        self._digests = {
+            source: file_digest(imo_data.source_path(source))
+            for source, stat in self._stats.items() if stat is not None and stat == current[source]
+        }
+        self._pending = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Sources whose contents changed since the last reload, with their new
+    # hashes; a file whose stat is still changing is left for the next poll
+    def poll(self):
+        changed = {}
+        for source in self.sources:
+            stat = imo_data.source_stat(source)
+            if stat is None or stat == self._stats[source]:
+                self._pending.pop(source, None)
+                continue
+            if self._pending.get(source) != stat:
+                self._pending[source] = stat
+                continue
+            del self._pending[source]
+            self._stats[source] = stat
+            digest = file_digest(imo_data.source_path(source))
+            if digest != self._digests.get(source):
+                changed[source] = digest
+        return changed
+
+    # Poll once and reload what changed; a source that fails to build is
+    # retried when it changes again, and the previous data stays served
+    def check(self):
+        changed = self.poll()
+        if not changed:
+            return []
+        try:
+            reloaded = imo_data.reload(list(changed))
+        except Exception:
+            log.exception('Reloading %s failed; still serving the previous data', ', '.join(changed))
+            return []
+        self._digests.update(changed)
+        # Entries of the old generation can no longer be hit
+        figure_cache.clear()
+        return reloaded
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                log.exception('Source watcher poll failed')
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='imo-hot-reload', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# Start this process's watcher (once)
+def start(interval=INTERVAL):
+    global _watcher
+    if _watcher is None:
+        _watcher = SourceWatcher(interval=interval).start()
+        log.info('Watching %d source files every %ss', len(_watcher.sources), interval)
+    return _watcher
@@ -0,0 +1,782 @@
+# Shared data layer for every dashboard and the notebook.
+#
+# Datasets are registered by name with the function that builds them and are
+# loaded on first access, then memoized for the life of the process, so all
+# views running in one process share a single parsed copy of each frame:
+#
+#     import imo_data
+#     df = imo_data.get('gdp_merged')
+#
+# The merged views are additionally persisted through frame_cache, so a warm
+# start skips the parse/melt/merge entirely.
+#
+# reload() rebuilds the loaded datasets affected by changed source files next
+# to the ones being served and swaps them in at once (see hot_reload.py).
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from contestant_analytics import ContestantAnalytics
+from contestant_data import ContestantArrays
+from cube import AggregateCube
+from frame_cache import cached_frame
+from indicator_matrix import IndicatorMatrix
+from score_tensor import ScoreTensor
+
+# IMO_DATA_DIR points every loader at another copy of the files, e.g. the
+# synthetic data written by generate_synthetic.py
+DATA_DIR = os.environ.get('IMO_DATA_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Source files, relative to DATA_DIR
+RESULTS_CSV = 'country_results_df.csv'
+TIMELINE_CSV = 'timeline_df.csv'
+INDIVIDUAL_CSV = 'individual_results_df.csv'
+GDP_CSV = os.path.join('support_datasets', 'GDP.csv')
+GDP_PER_CAPITA_CSV = os.path.join('support_datasets', 'GDP per capita.csv')
+GII_CSV = os.path.join('support_datasets', 'Gender Inequality Index.csv')
+
+# Bump when a cached builder changes so stale on-disk frames are rebuilt
+CACHE_VERSION = '7'
+
+# Tie handling for the per-year rank columns: 'min' gives tied countries the
+# best shared rank (1, 2, 2, 4), 'dense' does not skip (1, 2, 2, 3), 'max'
+# gives the worst shared rank and 'first' breaks ties by row order
+RANK_METHODS = ('min', 'dense', 'max', 'first')
+RANK_METHOD = os.environ.get('IMO_RANK_METHOD', 'min')
+
+# Fit the GDP trendlines against log10(x), matching the log-scaled x axis,
+# instead of plain OLS on x (what px trendline="ols" did)
+TRENDLINE_LOG_X = os.environ.get('IMO_TRENDLINE_LOG_X', '0') == '1'
+
+# Shrink every loaded frame to compact dtypes (see compact_frame); set
+# IMO_COMPACT_DTYPES=0 to keep pandas' default int64/float64/str columns
+COMPACT_DTYPES = os.environ.get('IMO_COMPACT_DTYPES', '1') != '0'
+# String columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+# Measures that stay float64: hover labels show them in full, and float32
+# keeps only ~7 significant digits of a GDP in the trillions
+FLOAT64_COLUMNS = {'GDP', 'GDP_per_capita', 'GII'}
+# Indicator files whose year columns stay float64, so the matrices (and the
+# merged columns above) are built from the values as written
+FLOAT64_DATASETS = {'gdp', 'gdp_per_capita', 'gii'}
+
+MEDAL_COLS = ['awards_gold', 'awards_silver', 'awards_bronze']
+GII_DIMENSIONS = ['Year', 'Continent', 'Human Development Groups', 'Hemisphere', 'UNDP Developing Regions']
+GII_MEASURES = ['female_ratio', 'GII', 'total_medals']
+# Per-country columns of the GII file carried into gii_merged
+GII_GROUPINGS = ['Continent', 'Hemisphere', 'Human Development Groups', 'UNDP Developing Regions']
+DEVELOPMENT_ORDER = ['Very High', 'High', 'Medium', 'Low']
+
+log = logging.getLogger(__name__)
+
+_registry = {}
+_frames = {}
+_footprints = {}
+_lock = threading.RLock()
+# Datasets each builder read through get(), recorded when it runs
+_dependencies = {}
+# Per thread: the datasets being built, and the reload in progress
+_local = threading.local()
+_reload_lock = threading.Lock()
+# Bumped whenever served datasets are replaced, so memoized figures can be
+# keyed by the data they were rendered from
+_generation = 0
+# (mtime, size) of each source file when a build first read it, so a watcher
+# started later still sees the changes made since (see hot_reload.py)
+_source_stats = {}
+
+
+def source_path(name):
+    return os.path.join(DATA_DIR, name)
+
+
+# (mtime, size) of a source file, None when it is missing
+def source_stat(name):
+    try:
+        stat = os.stat(source_path(name))
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def built_source_stats():
+    return dict(_source_stats)
+
+
+# Register a dataset builder under `name`.  Builders listed with `cached=True`
+# are persisted on disk, keyed by the contents of `sources`.
+def dataset(name, sources=(), cached=False):
+    def register(build):
+        _registry[name] = {'build': build, 'sources': tuple(sources), 'cached': cached}
+        return build
+    return register
+
+
+def _load(name):
+    if not hasattr(_local, 'building'):
+        _local.building = []
+    building = _local.building
+    building.append(name)
+    try:
+        return _build(name)
+    finally:
+        building.pop()
+
+
+def _build(name):
+    entry = _registry[name]
+    for source in entry['sources']:
+        if source not in _source_stats:
+            _source_stats[source] = source_stat(source)
+
+    def build():
+        _dependencies[name] = set()
+        frame = entry['build']()
+        if COMPACT_DTYPES and isinstance(frame, pd.DataFrame):
+            frame = compact_frame(name, frame)
+        return frame
+
+    if entry['cached']:
+        paths = [source_path(source) for source in entry['sources']]
+        version = f'{CACHE_VERSION}-{RANK_METHOD}-{int(COMPACT_DTYPES)}'
+        frame = cached_frame(name, paths, build, version=version)
+        # A warm start reads the already compacted frame back from disk
+        _footprints.setdefault(name, {'before': None, 'after': frame_bytes(frame)})
+        return frame
+    return build()
+
+
+def get(name):
+    if name not in _registry:
+        raise KeyError(f"Unknown dataset {name!r}; available: {', '.join(names())}")
+    building = getattr(_local, 'building', None)
+    if building:
+        _dependencies.setdefault(building[-1], set()).add(name)
+    # Inside reload(), stale datasets are built into the staging area
+    reloading = getattr(_local, 'reload', None)
+    if reloading is not None and name in reloading['stale']:
+        staged = reloading['staged']
+        if name not in staged:
+            staged[name] = _load(name)
+        return staged[name]
+    # Fast path without the lock once the dataset is loaded
+    frame = _frames.get(name)
+    if frame is not None:
+        return frame
+    with _lock:
+        if name not in _frames:
+            _frames[name] = _load(name)
+        return _frames[name]
+
+
+def names():
+    return sorted(_registry)
+
+
+# Whether `name` is persisted through the on-disk frame cache
+def is_cached(name):
+    return _registry[name]['cached']
+
+
+def loaded():
+    return sorted(_frames)
+
+
+# Load several datasets up front, e.g. before forking worker processes
+def preload(*dataset_names):
+    for name in dataset_names or names():
+        get(name)
+
+
+# Forget memoized frames so the next get() reloads them
+def clear(*dataset_names):
+    global _generation
+    with _lock:
+        for name in dataset_names or list(_frames):
+            _frames.pop(name, None)
+        _generation += 1
+
+
+def generation():
+    return _generation
+
+
+# The frame currently served under `name`, or None.  While reload() rebuilds
+# a dataset this is the version being replaced, which builders use to redo
+# only what changed.
+def previous(name):
+    return _frames.get(name)
+
+
+# ---------------------------------------------------------------------------
+# Reloading changed sources
+# ---------------------------------------------------------------------------
+
+# Datasets built from any of `sources` (paths relative to DATA_DIR), plus
+# every dataset built from those, transitively
+def dependents(sources):
+    sources = set(sources)
+    affected = {name for name, entry in _registry.items() if sources & set(entry['sources'])}
+    while True:
+        more = {name for name, deps in _dependencies.items() if deps & affected} - affected
+        if not more:
+            return affected
+        affected |= more
+
+
+# Rebuild the loaded datasets affected by changed `sources` and swap them in
+# together.  Requests keep reading the previous versions until the swap and
+# the new ones right after it; if a build fails nothing is replaced.
+# Returns the names of the datasets replaced.
+def reload(sources):
+    global _generation
+    with _reload_lock:
+        for source in sources:
+            _source_stats[source] = source_stat(source)
+        stale = dependents(sources)
+        targets = [name for name in names() if name in stale and name in _frames]
+        staged = {}
+        _local.reload = {'stale': stale, 'staged': staged}
+        try:
+            for name in targets:
+                get(name)
+        finally:
+            _local.reload = None
+
+        with _lock:
+            # Stale datasets loaded meanwhile from the old versions are
+            # dropped, to be rebuilt on next use
+            for name in stale - set(staged):
+                _frames.pop(name, None)
+            _frames.update(staged)
+            _generation += 1
+        log.info('Reloaded %s after changes to %s', ', '.join(sorted(staged)) or 'nothing', ', '.join(sources))
+        return sorted(staged)
+
+
+# Years of `year_col` whose rows differ between two versions of a frame
+def changed_years(old_df, new_df, year_col='year'):
+    def digests(df):
+        hashes = pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy())
+        sums = hashes.groupby(df[year_col].to_numpy()).agg(['sum', 'size'])
+        return dict(zip(sums.index, zip(sums['sum'], sums['size'])))
+
+    if list(old_df.columns) != list(new_df.columns):
+        return set(old_df[year_col]) | set(new_df[year_col])
+    old, new = digests(old_df), digests(new_df)
+    return {year for year in old.keys() | new.keys() if old.get(year) != new.get(year)}
+
+
+# ---------------------------------------------------------------------------
+# Compact dtypes
+# ---------------------------------------------------------------------------
+
+def frame_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# Smallest dtype that holds an integer column: uint8 for counts and ranks,
+# int16 for years, wider only when the values need it
+def _compact_integers(values):
+    if len(values) and values.min() >= 0 and values.max() <= np.iinfo('uint8').max:
+        return values.astype('uint8')
+    return pd.to_numeric(values, downcast='integer')
+
+
+def _compact_column(values):
+    if isinstance(values.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(values):
+        return values
+    if pd.api.types.is_integer_dtype(values):
+        return _compact_integers(values)
+    if pd.api.types.is_float_dtype(values):
+        # Small whole-number floats without gaps (medal sums) are really counts
+        if (values.notna().all() and (values == values.round()).all()
+                and values.abs().max() <= np.iinfo('int16').max):
+            return _compact_integers(values.astype('int64'))
+        return values.astype('float32')
+    if pd.api.types.is_string_dtype(values) or values.dtype == object:
+        if values.nunique() <= CATEGORY_MAX_RATIO * len(values):
+            return values.astype('category')
+    return values
+
+
+# Same frame with categorical strings, small integers and float32 measures
+# (except FLOAT64_COLUMNS, and every float column of FLOAT64_DATASETS); the
+# bytes before and after are logged and kept for footprints()
+def compact_frame(name, df):
+    before = frame_bytes(df)
+    keep_floats = name in FLOAT64_DATASETS
+
+    def compact(values):
+        if values.name in FLOAT64_COLUMNS or (keep_floats and pd.api.types.is_float_dtype(values)):
+            return values
+        return _compact_column(values)
+
+    df = df.apply(compact)
+    after = frame_bytes(df)
+    _footprints[name] = {'before': before, 'after': after}
+    log.info('%s: %s -> %s bytes in memory', name, f'{before:,}', f'{after:,}')
+    return df
+
+
+# In-memory bytes of each dataset compacted in this process, before and after
+# (before is None for frames read back from the on-disk cache)
+def footprints():
+    return dict(_footprints)
+
+
+# ---------------------------------------------------------------------------
+# Source datasets, parsed as-is
+# ---------------------------------------------------------------------------
+
+@dataset('results', [RESULTS_CSV])
+def load_results():
+    return pd.read_csv(source_path(RESULTS_CSV))
+
+
+@dataset('timeline', [TIMELINE_CSV])
+def load_timeline():
+    return pd.read_csv(source_path(TIMELINE_CSV))
+
+
+# Contestant rows streamed in typed chunks into compact per-year arrays
+@dataset('contestants', [INDIVIDUAL_CSV])
+def load_contestants():
+    return ContestantArrays.from_csv(source_path(INDIVIDUAL_CSV))
+
+
+# Medal cutoffs, score percentiles, solve rates and country distributions
+@dataset('contestant_analytics', [INDIVIDUAL_CSV])
+def build_contestant_analytics():
+    return ContestantAnalytics(get('contestants'))
+
+
+# The whole contestant table as one frame, decoded from the packed arrays
+@dataset('individual', [INDIVIDUAL_CSV])
+def load_individual():
+    return get('contestants').frame(slice(None))
+
+
+# Year x country x problem points and full scores, for per-problem reductions
+@dataset('score_tensor', [RESULTS_CSV, INDIVIDUAL_CSV])
+def build_score_tensor():
+    return ScoreTensor.from_results(get('results'), get('contestants'))
+
+
+@dataset('gdp', [GDP_CSV])
+def load_gdp():
+    return pd.read_csv(source_path(GDP_CSV))
+
+
+@dataset('gdp_per_capita', [GDP_PER_CAPITA_CSV])
+def load_gdp_per_capita():
+    return pd.read_csv(source_path(GDP_PER_CAPITA_CSV))
+
+
+@dataset('gii', [GII_CSV])
+def load_gii():
+    return pd.read_csv(source_path(GII_CSV))
+
+
+# ---------------------------------------------------------------------------
+# Partition indexes
+# ---------------------------------------------------------------------------
+
+# Year -> rows and country -> rows lookups over one merged frame, built once
+# so callbacks do a dict lookup instead of a boolean mask over the frame.
+# Given the index of a previous version of the frame, only the years whose
+# rows changed, and the countries with rows in them, are partitioned again.
+class PartitionIndex:
+    def __init__(self, df, year_col='year', country_col='Country', previous=None):
+        self.frame = df
+        self.year_col = year_col
+        self.country_col = country_col
+        self._empty = df.iloc[0:0]
+
+        if previous is None:
+            fresh = df
+            self.by_year, self.by_country, self.countries_by_year = {}, {}, {}
+        else:
+            changed = changed_years(previous.frame, df, year_col)
+            fresh = df[df[year_col].isin(changed)]
+            old_rows = previous.frame[previous.frame[year_col].isin(changed)]
+            touched = set(fresh[country_col]) | set(old_rows[country_col])
+            self.by_year = {year: part for year, part in previous.by_year.items() if year not in changed}
+            self.by_country = {country: part for country, part in previous.by_country.items()
+                               if country not in touched}
+            self.countries_by_year = {year: countries for year, countries in previous.countries_by_year.items()
+                                      if year not in changed}
+
+        fresh_years = dict(tuple(fresh.groupby(year_col, sort=True)))
+        self.by_year = dict(sorted({**self.by_year, **fresh_years}.items()))
+        touched_rows = df if previous is None else df[df[country_col].isin(touched)]
+        self.by_country.update(
+            (country, part.sort_values(year_col))
+            for country, part in touched_rows.groupby(country_col, sort=False)
+        )
+        # Countries per year, in frame order (the dropdown order)
+        self.countries_by_year.update(
+            (year, part[country_col].unique()) for year, part in fresh_years.items()
+        )
+        # Position of each (year, country) row for single-row lookups
+        self._positions = {
+            key: pos for pos, key in enumerate(zip(df[year_col], df[country_col]))
+        }
+
+    def years(self):
+        return list(self.by_year)
+
+    def year(self, year):
+        return self.by_year.get(year, self._empty)
+
+    def country(self, country):
+        return self.by_country.get(country, self._empty)
+
+    def countries(self, year):
+        return self.countries_by_year.get(year, self._empty[self.country_col].unique())
+
+    # One-row frame for (year, country), empty if the pair is unknown
+    def row(self, year, country):
+        pos = self._positions.get((year, country))
+        if pos is None:
+            return self._empty
+        return self.frame.iloc[[pos]]
+
+
+# ---------------------------------------------------------------------------
+# Trendlines
+# ---------------------------------------------------------------------------
+
+# Per-year OLS fit of y on x (or on log10 x), all years in one vectorized pass
+# over the frame.  Returns slope, intercept, r2, n and the x range per year.
+def fit_trendlines(df, x_col, y_col, year_col='year', log_x=False):
+    codes, years = pd.factorize(df[year_col], sort=True)
+    x = df[x_col].to_numpy(dtype='float64')
+    y = df[y_col].to_numpy(dtype='float64')
+    x_fit = np.log10(x) if log_x else x
+    groups = len(years)
+
+    n = np.bincount(codes, minlength=groups).astype('float64')
+    mean_x = np.bincount(codes, x_fit, groups) / n
+    mean_y = np.bincount(codes, y, groups) / n
+    # Centered sums of squares and cross products
+    dx = x_fit - mean_x[codes]
+    dy = y - mean_y[codes]
+    sxx = np.bincount(codes, dx * dx, groups)
+    syy = np.bincount(codes, dy * dy, groups)
+    sxy = np.bincount(codes, dx * dy, groups)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        r2 = np.where((sxx > 0) & (syy > 0), sxy * sxy / (sxx * syy), np.nan)
+    intercept = mean_y - slope * mean_x
+
+    x_min = np.full(groups, np.inf)
+    x_max = np.full(groups, -np.inf)
+    np.minimum.at(x_min, codes, x)
+    np.maximum.at(x_max, codes, x)
+
+    return pd.DataFrame({
+        'slope': slope,
+        'intercept': intercept,
+        'r2': r2,
+        'n': n.astype('int64'),
+        'x_min': x_min,
+        'x_max': x_max,
+        'log_x': log_x,
+    }, index=pd.Index(years, name=year_col))
+
+
+# fit_trendlines() reusing the fits of a previous version of the frame for
+# the years whose rows did not change
+def refit_trendlines(previous_fits, previous_df, df, x_col, y_col, year_col='year', log_x=False):
+    if previous_fits is None or previous_df is None or bool(previous_fits['log_x'].all()) != log_x:
+        return fit_trendlines(df, x_col, y_col, year_col, log_x)
+    changed = changed_years(previous_df, df, year_col)
+    if not changed:
+        return previous_fits
+    kept = previous_fits[~previous_fits.index.isin(changed)]
+    refit = fit_trendlines(df[df[year_col].isin(changed)], x_col, y_col, year_col, log_x)
+    return pd.concat([kept, refit.astype(kept.dtypes.to_dict())]).sort_index()
+
+
+# Points along a fitted trendline between x_min and x_max.  A fit on log10 x
+# is straight on the log axis, so its two end points are enough; a linear fit
+# is sampled geometrically so it draws as a smooth curve on that axis.
+def trendline_points(params, points=50):
+    if params['log_x']:
+        x = np.array([params['x_min'], params['x_max']])
+        y = params['intercept'] + params['slope'] * np.log10(x)
+    else:
+        x = np.geomspace(params['x_min'], params['x_max'], points)
+        y = params['intercept'] + params['slope'] * x
+    return x, y
+
+
+# ---------------------------------------------------------------------------
+# Merged views used by the dashboards
+# ---------------------------------------------------------------------------
+
+# Results with numeric medal counts and the derived per-team columns
+def prepare_results(results_df):
+    results_df = results_df.copy()
+    results_df['year'] = pd.to_numeric(results_df['year'])
+    for col in MEDAL_COLS:
+        results_df[col] = pd.to_numeric(results_df[col], errors='coerce').fillna(0)
+    results_df['total_medals'] = results_df[MEDAL_COLS].sum(axis=1)
+    results_df['team_size_female'] = pd.to_numeric(results_df['team_size_female'])
+    results_df['team_size_all'] = pd.to_numeric(results_df['team_size_all'])
+    results_df['female_ratio'] = results_df['team_size_female'] / results_df['team_size_all']
+    return results_df
+
+
+# Per-year descending ranks of `rank_cols` (column -> rank column name) plus
+# the number of countries in each year, from a single groupby over the frame
+def add_ranks(df, rank_cols, method=None):
+    method = method or RANK_METHOD
+    if method not in RANK_METHODS:
+        raise ValueError(f"Unknown rank method {method!r}; expected one of {RANK_METHODS}")
+
+    by_year = df.groupby('year', sort=False)
+    for col, rank_col in rank_cols.items():
+        df[rank_col] = by_year[col].rank(method=method, ascending=False).astype('int64')
+    df['participants'] = by_year['year'].transform('size')
+    return df
+
+
+# ---------------------------------------------------------------------------
+# Country crosswalk
+# ---------------------------------------------------------------------------
+
+# ISO3 codes for country names that appear in the IMO results or the UN GDP per
+# capita file but match neither a `Country` of GDP.csv nor one of the GII file.
+# Historical teams get their ISO 3166-3 codes; teams with no code at all (the
+# 1992 Commonwealth of Independent States, Northern Cyprus) are left out and
+# reported as unmatched.
+COUNTRY_CODE_ALIASES = {
+    # IMO results
+    'Czech Republic': 'CZE',
+    'Czechoslovakia': 'CSK',
+    "Democratic People's Republic of Korea": 'PRK',
+    'German Democratic Republic': 'DDR',
+    'Islamic Republic of Iran': 'IRN',
+    'Laos': 'LAO',
+    'Macau': 'MAC',
+    'Palestine': 'PSE',
+    "People's Republic of China": 'CHN',
+    'Republic of Korea': 'KOR',
+    'Republic of Moldova': 'MDA',
+    'Serbia and Montenegro': 'SCG',
+    'Syria': 'SYR',
+    'Taiwan': 'TWN',
+    'Türkiye': 'TUR',
+    'Union of Soviet Socialist Republics': 'SUN',
+    'United States of America': 'USA',
+    'Yugoslavia': 'YUG',
+    # UN GDP per capita file
+    'Bolivia (Plurinational State of)': 'BOL',
+    'China, Hong Kong SAR': 'HKG',
+    'China, Macao SAR': 'MAC',
+    "Côte d'Ivoire": 'CIV',
+    'Czechoslovakia (Former)': 'CSK',
+    'D.P.R. of Korea': 'PRK',
+    'D.R. of the Congo': 'COD',
+    'Iran (Islamic Republic of)': 'IRN',
+    "Lao People's DR": 'LAO',
+    'Micronesia (FS of)': 'FSM',
+    'State of Palestine': 'PSE',
+    'U.R. of Tanzania: Mainland': 'TZA',
+    'USSR (Former)': 'SUN',
+    'Venezuela (Bolivarian Republic of)': 'VEN',
+    'Yugoslavia (Former)': 'YUG',
+}
+
+
+# Country name -> ISO3 from the coded indicator files plus the aliases
+def country_name_codes():
+    gdp_df = get('gdp')
+    gii_df = get('gii')
+    codes = dict(zip(gdp_df['Country'], gdp_df['Country Code']))
+    codes.update(zip(gii_df['Country'], gii_df['ISO3']))
+    codes.update(COUNTRY_CODE_ALIASES)
+    return codes
+
+
+# One row per IMO country name with its ISO3 code as a categorical over every
+# code any source uses, so all join keys share the same integer codes
+@dataset('country_crosswalk', [RESULTS_CSV, GDP_CSV, GII_CSV])
+def build_country_crosswalk():
+    name_codes = country_name_codes()
+    iso3_dtype = pd.CategoricalDtype(sorted(set(name_codes.values())))
+
+    countries = sorted(get('results')['country'].unique())
+    crosswalk = pd.DataFrame({
+        'country': countries,
+        'iso3': pd.Categorical([name_codes.get(country) for country in countries], dtype=iso3_dtype),
+    })
+
+    unmatched = crosswalk.loc[crosswalk['iso3'].isna(), 'country'].tolist()
+    if unmatched:
+        log.info('No ISO3 code for IMO countries: %s', ', '.join(unmatched))
+    return crosswalk
+
+
+# ISO3 keys for rows of an indicator file, from a code column or by name
+def indicator_codes(indicator_df, code_col=None):
+    iso3_dtype = get('country_crosswalk')['iso3'].dtype
+    if code_col is not None:
+        codes = indicator_df[code_col]
+    else:
+        codes = indicator_df['Country'].map(country_name_codes())
+    return pd.Categorical(codes, dtype=iso3_dtype)
+
+
+# Results keyed by ISO3; rows of countries without a code are dropped
+def results_with_codes(results_df):
+    crosswalk = get('country_crosswalk')
+    iso3 = dict(zip(crosswalk['country'], crosswalk['iso3']))
+    results_df = results_df.assign(
+        iso3=pd.Categorical(results_df['country'].map(iso3), dtype=crosswalk['iso3'].dtype)
+    )
+    return results_df[results_df['iso3'].notna()]
+
+
+# IMO countries each indicator file cannot be joined to, instead of silently
+# dropping their rows: no ISO3 code at all, or a code the file has no row for
+@dataset('unmatched_countries', [RESULTS_CSV, GDP_CSV, GII_CSV, GDP_PER_CAPITA_CSV])
+def build_unmatched_countries():
+    crosswalk = get('country_crosswalk')
+    report = {'no_code': crosswalk.loc[crosswalk['iso3'].isna(), 'country'].tolist()}
+    coded = crosswalk[crosswalk['iso3'].notna()]
+    for name, codes in (('gdp', indicator_codes(get('gdp'), 'Country Code')),
+                        ('gdp_per_capita', indicator_codes(get('gdp_per_capita'))),
+                        ('gii', indicator_codes(get('gii'), 'ISO3'))):
+        known = set(codes.dropna())
+        report[name] = coded.loc[~coded['iso3'].isin(known), 'country'].tolist()
+    return report
+
+
+# Medals joined to an indicator: one gather of the (iso3, year) cells of the
+# results rows, keeping the rows the indicator has a value for
+def merge_indicator(matrix, value_name, rank_col):
+    results_df = results_with_codes(prepare_results(get('results')))
+    merged_df = results_df[['country', 'iso3', 'year', 'total_medals']].rename(columns={'country': 'Country'})
+    merged_df[value_name] = matrix.gather(results_df['iso3'].cat.codes, results_df['year'])
+    merged_df = merged_df[merged_df[value_name].notna()].reset_index(drop=True)
+    return add_ranks(merged_df, {value_name: rank_col, 'total_medals': 'medals_rank'})
+
+
+CROSSWALK_SOURCES = [RESULTS_CSV, GDP_CSV, GII_CSV]
+
+
+# ---------------------------------------------------------------------------
+# Indicator matrices
+# ---------------------------------------------------------------------------
+
+# Every indicator file becomes an IndicatorMatrix over the crosswalk's ISO3
+# codes; a new indicator only needs its codes and its year columns.  The
+# years are whatever columns the file has, so other copies of the data (see
+# IMO_DATA_DIR) may cover other ranges.
+def year_columns(df, pattern=r'(\d{4})'):
+    columns = {}
+    for col in df.columns:
+        match = re.fullmatch(pattern, str(col))
+        if match:
+            columns[int(match.group(1))] = col
+    return columns
+
+
+@dataset('gdp_matrix', CROSSWALK_SOURCES)
+def build_gdp_matrix():
+    gdp_df = get('gdp')
+    return IndicatorMatrix.from_wide(gdp_df, indicator_codes(gdp_df, 'Country Code'), year_columns(gdp_df))
+
+
+@dataset('gdp_per_capita_matrix', CROSSWALK_SOURCES + [GDP_PER_CAPITA_CSV])
+def build_gdp_per_capita_matrix():
+    gdp_pc_df = get('gdp_per_capita')
+    return IndicatorMatrix.from_wide(gdp_pc_df, indicator_codes(gdp_pc_df), year_columns(gdp_pc_df))
+
+
+# GII columns are named like "Gender Inequality Index (2021)"
+@dataset('gii_matrix', CROSSWALK_SOURCES)
+def build_gii_matrix():
+    gii_df = get('gii')
+    return IndicatorMatrix.from_wide(gii_df, indicator_codes(gii_df, 'ISO3'),
+                                     year_columns(gii_df, r'Gender Inequality Index \((\d{4})\)'))
+
+
+# ---------------------------------------------------------------------------
+# Indicators joined to the results
+# ---------------------------------------------------------------------------
+
+@dataset('gdp_merged', CROSSWALK_SOURCES, cached=True)
+def build_gdp_merged():
+    return merge_indicator(get('gdp_matrix'), 'GDP', 'gdp_rank')
+
+
+@dataset('gdp_per_capita_merged', CROSSWALK_SOURCES + [GDP_PER_CAPITA_CSV], cached=True)
+def build_gdp_per_capita_merged():
+    return merge_indicator(get('gdp_per_capita_matrix'), 'GDP_per_capita', 'gdp_per_capita_rank')
+
+
+# Results rows of the country-years the GII file covers, with the country's
+# GII groupings and that year's GII
+@dataset('gii_merged', CROSSWALK_SOURCES, cached=True)
+def build_gii_merged():
+    gii_df = get('gii')
+    matrix = get('gii_matrix')
+
+    results_df = results_with_codes(prepare_results(get('results')))
+    codes = results_df['iso3'].cat.codes.to_numpy()
+    years = results_df['year'].to_numpy()
+    covered = matrix.contains(codes, years)
+    codes, years = codes[covered], years[covered]
+
+    groupings = gii_df[GII_GROUPINGS].iloc[matrix.source_rows[codes]].reset_index(drop=True)
+    merged_df = pd.concat([results_df[covered].reset_index(drop=True), groupings], axis=1)
+    merged_df['Year'] = years.astype('int64')
+    merged_df['GII'] = matrix.gather(codes, years)
+    merged_df['Country'] = merged_df['country']
+
+    merged_df['Human Development Groups'] = pd.Categorical(
+        merged_df['Human Development Groups'],
+        categories=DEVELOPMENT_ORDER,
+        ordered=True
+    )
+    return merged_df
+
+
+# Sums, counts and means of the GII measures for every combination of the
+# GII dimensions, so the gender views never group the row-level frame
+@dataset('gii_cube')
+def build_gii_cube():
+    return AggregateCube.from_frame(get('gii_merged'), GII_DIMENSIONS, GII_MEASURES)
+
+
+# On a reload, the indexes and trendlines only redo the years that changed
+@dataset('gdp_index')
+def build_gdp_index():
+    return PartitionIndex(get('gdp_merged'), previous=previous('gdp_index'))
+
+
+@dataset('gdp_per_capita_index')
+def build_gdp_per_capita_index():
+    return PartitionIndex(get('gdp_per_capita_merged'), previous=previous('gdp_per_capita_index'))
+
+
+@dataset('gdp_trendlines')
+def build_gdp_trendlines():
+    return refit_trendlines(previous('gdp_trendlines'), previous('gdp_merged'), get('gdp_merged'),
+                            'GDP', 'total_medals', log_x=TRENDLINE_LOG_X)
+
+
+@dataset('gdp_per_capita_trendlines')
+def build_gdp_per_capita_trendlines():
+    return refit_trendlines(previous('gdp_per_capita_trendlines'), previous('gdp_per_capita_merged'),
+                            get('gdp_per_capita_merged'), 'GDP_per_capita', 'total_medals',
+                            log_x=TRENDLINE_LOG_X)
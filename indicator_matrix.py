@@ -0,0 +1,81 @@
+# Dense country x year matrices for the indicator files (GDP, GDP per capita,
+# GII: one row per country, one column per year).
+#
+# An indicator is held as a float64 matrix whose rows are the ISO3 categories
+# every join key shares (imo_data's country crosswalk) and whose columns are
+# consecutive years.  Looking up a (country, year) cell, or a whole vector of
+# them, is then one indexed gather on the categorical codes instead of a melt
+# into a long frame plus a merge:
+#
+#     gdp = imo_data.get('gdp_matrix')
+#     gdp.gather(results['iso3'].cat.codes, results['year'])
+#
+# Cells the file leaves empty are NaN; contains() tells those apart from
+# countries or years the file does not cover at all.
+import numpy as np
+import pandas as pd
+
+
+class IndicatorMatrix:
+    def __init__(self, values, categories, first_year, year_present, source_rows):
+        # (countries, years) float64 values, NaN where missing
+        self.values = values
+        # ISO3 code of each row
+        self.categories = categories
+        self.first_year = first_year
+        # Whether the file has a column for each year in the range
+        self.year_present = year_present
+        # Row of the source file each country was read from, -1 if none
+        self.source_rows = source_rows
+
+    # Matrix of a wide file: `codes` is the ISO3 Categorical of its rows and
+    # `year_columns` maps each year to its column.  A country listed twice
+    # keeps its first row.
+    @classmethod
+    def from_wide(cls, df, codes, year_columns):
+        years = np.array(sorted(year_columns))
+        first_year = int(years[0])
+        year_present = np.zeros(years[-1] - first_year + 1, dtype=bool)
+        year_present[years - first_year] = True
+
+        row_codes = np.asarray(codes.codes, dtype='int64')
+        coded = np.flatnonzero(row_codes >= 0)
+        countries, first = np.unique(row_codes[coded], return_index=True)
+        file_rows = coded[first]
+        source_rows = np.full(len(codes.categories), -1, dtype='int64')
+        source_rows[countries] = file_rows
+
+        columns = [year_columns[year] for year in years]
+        block = df[columns].iloc[file_rows].apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64')
+        values = np.full((len(codes.categories), len(year_present)), np.nan)
+        values[np.ix_(countries, years - first_year)] = block
+        return cls(values, codes.categories, first_year, year_present, source_rows)
+
+    def years(self):
+        return (self.first_year + np.flatnonzero(self.year_present)).tolist()
+
+    # Matrix cells of each (code, year) pair, and whether the file covers it
+    def _cells(self, codes, years):
+        rows = np.asarray(codes, dtype='int64')
+        cols = np.asarray(years, dtype='int64') - self.first_year
+        covered = (rows >= 0) & (cols >= 0) & (cols < len(self.year_present))
+        rows = np.where(covered, rows, 0)
+        cols = np.where(covered, cols, 0)
+        covered &= (self.source_rows[rows] >= 0) & self.year_present[cols]
+        return rows, cols, covered
+
+    # Whether the file has a row for each country code and a column for each
+    # year (the pairs an inner join on iso3 and year would keep)
+    def contains(self, codes, years):
+        return self._cells(codes, years)[2]
+
+    # Values of the (code, year) pairs; NaN outside the file
+    def gather(self, codes, years):
+        rows, cols, covered = self._cells(codes, years)
+        return np.where(covered, self.values[rows, cols], np.nan)
+
+    # Single value by ISO3 code
+    def value(self, iso3, year):
+        if iso3 not in self.categories:
+            return np.nan
+        return float(self.gather([self.categories.get_loc(iso3)], [year])[0])
@@ -0,0 +1,109 @@
+# Lean figure payloads for slow links.
+#
+# With IMO_LEAN_PAYLOAD=1 the dashboards send smaller figures:
+#
+# - scatter plots are WebGL (scattergl) traces;
+# - the layout template keeps only the trace defaults of trace types the
+#   figure actually uses (a full template carries ~6 KB of defaults for every
+#   trace type Plotly knows);
+# - float64 typed arrays are re-encoded as base64 float32 arrays, which is
+#   plenty of precision for screen coordinates, except the values a hover
+#   label shows (e.g. GDP=%{x}): float32 keeps only ~7 significant digits,
+#   which would change GDPs in the trillions;
+# - slider marks keep every year selectable but only label every MARK_EVERY-th.
+#
+# Each figure's size before and after is logged and kept for sizes().
+import base64
+import logging
+import os
+import re
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+ENABLED = os.environ.get('IMO_LEAN_PAYLOAD', '0') == '1'
+
+# Label every n-th year on the year sliders
+MARK_EVERY = 5
+
+log = logging.getLogger(__name__)
+
+_sizes = {}
+
+
+def json_bytes(value):
+    return len(to_json_plotly(value))
+
+
+def _trace_types(fig):
+    return {trace.get('type', 'scatter') for trace in fig.get('data', [])}
+
+
+# Attribute paths of a trace whose values its hover label shows: the
+# %{...} fields of the hovertemplate (x, marker.color, customdata, ...), or
+# Plotly's default x, y and z
+def _hover_paths(trace):
+    if trace.get('hoverinfo') in ('skip', 'none'):
+        return set()
+    template = trace.get('hovertemplate')
+    if not template:
+        return {'x', 'y', 'z'}
+    if isinstance(template, list):
+        template = ''.join(template)
+    return set(re.findall(r'%\{([\w.]+)', template))
+
+
+# Base64 float64 arrays (Plotly's typed-array spec) as float32, except the
+# ones at the attribute paths in `keep`
+def _downcast(value, keep=frozenset(), path=''):
+    if isinstance(value, dict):
+        if value.get('dtype') == 'f8' and 'bdata' in value and len(value) <= 3:
+            if path in keep:
+                return value
+            array = np.frombuffer(base64.b64decode(value['bdata']), dtype='float64')
+            return dict(value, dtype='f4', bdata=base64.b64encode(array.astype('float32').tobytes()).decode())
+        return {key: _downcast(item, keep, f'{path}.{key}' if path else key) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_downcast(item, keep, path) for item in value]
+    return value
+
+
+def _downcast_traces(traces):
+    return [_downcast(trace, _hover_paths(trace)) for trace in traces]
+
+
+# Lean copy of a figure dict (as returned by Figure.to_dict())
+def lean_figure(fig):
+    fig = dict(fig, data=_downcast_traces(fig.get('data', [])), layout=_downcast(fig.get('layout', {})))
+    if fig.get('frames'):
+        fig['frames'] = [dict(frame, data=_downcast_traces(frame.get('data', []))) for frame in fig['frames']]
+    template = fig.get('layout', {}).get('template')
+    if template and 'data' in template:
+        used = _trace_types(fig)
+        template = dict(template, data={kind: defaults for kind, defaults in template['data'].items()
+                                        if kind in used})
+        fig['layout'] = dict(fig['layout'], template=template)
+    return fig
+
+
+# Marks for a year slider: every year stays a mark (so step=None still snaps
+# to the years with data), but only every MARK_EVERY-th year and the last are
+# labelled when lean
+def slider_marks(years):
+    years = sorted(int(year) for year in years)
+    if not ENABLED:
+        return {str(year): str(year) for year in years}
+    return {
+        str(year): str(year) if (year - years[0]) % MARK_EVERY == 0 or year == years[-1] else ''
+        for year in years
+    }
+
+
+def record(name, before, after):
+    _sizes[name] = {'before': before, 'after': after}
+    log.info('%s: %s -> %s bytes', name, f'{before:,}', f'{after:,}')
+
+
+# Serialized bytes of each lean figure built in this process, before and after
+def sizes():
+    return dict(_sizes)
@@ -0,0 +1,158 @@
+# Callback latency and payload metrics in Prometheus text format.
+#
+# With IMO_METRICS=1, instrument(app) hooks the app's Flask server around
+# /_dash-update-component, the single endpoint every Dash callback is served
+# from, and records per callback: calls, errors (5xx responses), a latency
+# histogram and a histogram of the serialized response size.  They are
+# exposed, along with the figure cache counters, at /metrics:
+#
+#     imo_callback_latency_seconds_bucket{callback="gdp.update_graphs",le="0.05"} 118
+#
+# When disabled, instrument() installs nothing, so requests pay no cost.
+# Every worker process keeps its own counters.
+import os
+import threading
+import time
+
+from flask import Response, g, request
+
+import figure_cache
+
+ENABLED = os.environ.get('IMO_METRICS', '0') == '1'
+
+CALLBACK_PATH = '/_dash-update-component'
+METRICS_PATH = '/metrics'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.total = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+
+    # Cumulative (le, count) pairs, as Prometheus expects
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            running += count
+            yield bound, running
+
+
+class CallbackMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.errors = {}
+        self.latency = {}
+        self.response_bytes = {}
+
+    def record(self, callback, seconds, size, failed):
+        with self._lock:
+            if callback not in self.calls:
+                self.calls[callback] = 0
+                self.errors[callback] = 0
+                self.latency[callback] = Histogram(LATENCY_BUCKETS)
+                self.response_bytes[callback] = Histogram(BYTES_BUCKETS)
+            self.calls[callback] += 1
+            self.errors[callback] += int(failed)
+            self.latency[callback].observe(seconds)
+            self.response_bytes[callback].observe(size)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            callbacks = sorted(self.calls)
+            lines += _header('imo_callback_calls_total', 'counter', 'Dash callback requests.')
+            lines += [f'imo_callback_calls_total{_labels(callback=c)} {self.calls[c]}' for c in callbacks]
+            lines += _header('imo_callback_errors_total', 'counter', 'Dash callback requests that failed.')
+            lines += [f'imo_callback_errors_total{_labels(callback=c)} {self.errors[c]}' for c in callbacks]
+            lines += _histogram('imo_callback_latency_seconds', 'Dash callback latency.',
+                                self.latency, callbacks)
+            lines += _histogram('imo_callback_response_bytes', 'Serialized Dash callback response size.',
+                                self.response_bytes, callbacks)
+
+        stats = figure_cache.stats()
+        for name, help_text in (('hits', 'Figure cache hits.'), ('misses', 'Figure cache misses.')):
+            lines += _header(f'imo_figure_cache_{name}_total', 'counter', help_text)
+            lines += [f'imo_figure_cache_{name}_total{_labels(renderer=r)} {stats[r][name]}' for r in sorted(stats)]
+        lines += _header('imo_figure_cache_entries', 'gauge', 'Figures held by the figure cache.')
+        lines += [f'imo_figure_cache_entries{_labels(renderer=r)} {stats[r]["currsize"]}' for r in sorted(stats)]
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _header(name, kind, help_text):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+
+
+def _histogram(name, help_text, histograms, callbacks):
+    lines = _header(name, 'histogram', help_text)
+    for callback in callbacks:
+        histogram = histograms[callback]
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{_labels(callback=callback, le=bound)} {count}')
+        lines.append(f'{name}_sum{_labels(callback=callback)} {histogram.total}')
+        lines.append(f'{name}_count{_labels(callback=callback)} {sum(histogram.counts)}')
+    return lines
+
+
+# Readable name of the callback a request is for, e.g. gdp.update_graphs;
+# falls back to Dash's output id
+def callback_name(app, output):
+    entry = app.callback_map.get(output)
+    func = entry and entry.get('callback')
+    if func is not None and hasattr(func, '__name__'):
+        return f'{func.__module__}.{func.__name__}'
+    return output
+
+
+def instrument(app, enabled=None):
+    enabled = ENABLED if enabled is None else enabled
+    if not enabled:
+        return None
+
+    collected = CallbackMetrics()
+    server = app.server
+
+    @server.before_request
+    def start_timer():
+        if request.path.endswith(CALLBACK_PATH):
+            g.imo_callback_start = time.perf_counter()
+
+    @server.after_request
+    def record_callback(response):
+        start = g.pop('imo_callback_start', None)
+        if start is not None:
+            body = request.get_json(silent=True) or {}
+            collected.record(
+                callback_name(app, body.get('output', '')),
+                time.perf_counter() - start,
+                response.content_length or 0,
+                response.status_code >= 500,
+            )
+        return response
+
+    @server.route(METRICS_PATH)
+    def metrics_endpoint():
+        return Response(collected.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    return collected
@@ -0,0 +1,7 @@
+import dash
+
+import contestant_stats
+
+dash.register_page(__name__, path='/contestant-stats', name='Contestant statistics', order=8,
+                   layout=contestant_stats.layout)
+contestant_stats.register_callbacks(dash)
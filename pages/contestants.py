@@ -0,0 +1,7 @@
+import dash
+
+import contestants
+
+dash.register_page(__name__, path='/contestants', name='Contestant results', order=7,
+                   layout=contestants.layout)
+contestants.register_callbacks(dash)
@@ -0,0 +1,6 @@
+import dash
+
+import gdp
+
+dash.register_page(__name__, path='/gdp', name='GDP vs IMO results', order=5, layout=gdp.layout)
+gdp.register_callbacks(dash)
@@ -0,0 +1,7 @@
+import dash
+
+import gdp_per_capita
+
+dash.register_page(__name__, path='/gdp-per-capita', name='GDP per capita vs IMO results', order=6,
+                   layout=gdp_per_capita.layout)
+gdp_per_capita.register_callbacks(dash)
@@ -0,0 +1,6 @@
+import dash
+
+import gender
+
+dash.register_page(__name__, path='/gender', name='Gender equality', order=4, layout=gender.layout)
+gender.register_callbacks(dash)
@@ -0,0 +1,14 @@
+import dash
+from dash import dcc, html
+
+dash.register_page(__name__, path='/', name='Overview', order=-1)
+
+
+def layout(**query_parameters):
+    return html.Div([
+        html.H1("International Mathematics Olympiad (IMO) Data Visualization"),
+        html.Ul([
+            html.Li(dcc.Link(page['name'], href=page['relative_path']))
+            for page in dash.page_registry.values() if page['path'] != '/'
+        ])
+    ])
@@ -0,0 +1,87 @@
+# Medal performance of one country over time (competition_evolution.ipynb)
+import dash
+from dash import Input, Output, dcc, html
+import plotly.graph_objects as go
+
+import imo_data
+
+dash.register_page(__name__, path='/medals', name='Country medal performance', order=3)
+
+COUNTRY_DROPDOWN = 'medals-country-dropdown'
+MEDAL_CHART = 'medals-medal-chart'
+MEDAL_POINTS_CHART = 'medals-medal-points-chart'
+
+
+def layout(**query_parameters):
+    countries = imo_data.get('results')['country'].unique()
+    return html.Div([
+        html.H1("Country Medal Performance Over Time"),
+        dcc.Dropdown(
+            id=COUNTRY_DROPDOWN,
+            options=[{'label': country, 'value': country} for country in countries],
+            value=countries[0]  # Set a default value
+        ),
+        dcc.Graph(id=MEDAL_CHART),
+        dcc.Graph(id=MEDAL_POINTS_CHART)
+    ])
+
+
+def country_rows(selected_country):
+    country_df = imo_data.get('results')
+    return country_df[country_df['country'] == selected_country]
+
+
+@dash.callback(
+    Output(MEDAL_CHART, 'figure'),
+    Input(COUNTRY_DROPDOWN, 'value')
+)
+def update_graph(selected_country):
+    # Filter data for the selected country
+    country_data = country_rows(selected_country)
+
+    # Create the line graph
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(x=country_data['year'], y=country_data['awards_gold'],
+                             mode='lines', name='Gold', line=dict(color='gold')))
+    fig.add_trace(go.Scatter(x=country_data['year'], y=country_data['awards_silver'],
+                             mode='lines', name='Silver', line=dict(color='silver')))
+    fig.add_trace(go.Scatter(x=country_data['year'], y=country_data['awards_bronze'],
+                             mode='lines', name='Bronze', line=dict(color='brown')))
+    fig.add_trace(go.Scatter(x=country_data['year'], y=country_data['awards_honorable_mentions'],
+                             mode='lines', name='Honorable Mentions', line=dict(color='red')))
+
+    fig.update_layout(
+        title=f'Medal Performance of {selected_country} Over Time',
+        xaxis_title='Year',
+        yaxis_title='Number of Medals'
+    )
+
+    return fig
+
+
+@dash.callback(
+    Output(MEDAL_POINTS_CHART, 'figure'),
+    Input(COUNTRY_DROPDOWN, 'value') # Use the same dropdown as the medal chart
+)
+def update_medal_points_chart(selected_country):
+    # Filter data for the selected country
+    country_data = country_rows(selected_country)
+
+    # Calculate medal points (as floats: the compact medal columns are uint8)
+    medal_points = (country_data['awards_gold'].astype('float64') * 8 +
+                    country_data['awards_silver'] * 4 +
+                    country_data['awards_bronze'] * 2 +
+                    country_data['awards_honorable_mentions'] * 1)
+
+    # Create the medal points chart
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=country_data['year'], y=medal_points,
+                             mode='lines+markers', name='Medal Points',line=dict(color='gold')))
+
+    fig.update_layout(
+        title=f'Medal Points of {selected_country} Over Time',
+        xaxis_title='Year',
+        yaxis_title='Medal Points'
+    )
+    return fig
@@ -0,0 +1,33 @@
+# Number of countries and participants per year (competition_evolution.ipynb)
+import dash
+from dash import dcc, html
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+import imo_data
+
+dash.register_page(__name__, path='/participation', name='Countries and participants', order=0)
+
+
+# The chart is static, so it is built with the layout when the page is opened
+def layout(**query_parameters):
+    timeline_df = imo_data.get('timeline')
+
+    # Calculate the correlation
+    correlation = timeline_df['countries'].corr(timeline_df['all_contestant'])
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    fig.add_trace(go.Scatter(x=timeline_df['year'], y=timeline_df['all_contestant'], name='Participants'), secondary_y=False)
+    fig.add_trace(go.Scatter(x=timeline_df['year'], y=timeline_df['countries'], name='Number of Countries'), secondary_y=True)
+
+    fig.update_layout(title_text="Number of Countries and Participants Over Time",
+                      xaxis_title="Year",
+                      yaxis_title="Participants",
+                      yaxis2_title="Number of Countries")
+
+    return html.Div([
+        html.H1("Number of Countries and Participants Over Time"),
+        dcc.Graph(id='participation-timeline-chart', figure=fig),
+        html.P(f"Correlation between number of countries and participants: {correlation:.5f}") # Display the correlation
+    ])
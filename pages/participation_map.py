@@ -0,0 +1,70 @@
+# Map of the countries taking part in each year (competition_evolution.ipynb)
+import dash
+from dash import Input, Output, dcc, html
+import plotly.express as px
+
+import animated
+import imo_data
+
+dash.register_page(__name__, path='/participation-map', name='Participating countries', order=1)
+
+YEAR_SLIDER = 'participation-map-year-slider'
+COUNTRY_MAP = 'participation-map-country-map'
+
+
+def layout(**query_parameters):
+    # Animated mode: every year is a frame of one figure, scrubbed in the
+    # browser (see animated.py)
+    if animated.ENABLED:
+        return html.Div([
+            html.H1("Countries Participating in the Competition"),
+            dcc.Graph(id=COUNTRY_MAP, figure=animated.participation_map_figure())
+        ])
+
+    timeline_df = imo_data.get('timeline')
+    return html.Div([
+        html.H1("Countries Participating in the Competition"),
+        dcc.Slider(
+            id=YEAR_SLIDER,
+            min=timeline_df['year'].min(),
+            max=timeline_df['year'].max(),
+            step=1,
+            value=timeline_df['year'].max(), # Start with the most recent year
+            marks=None,
+            tooltip={
+                "always_visible": True,
+                "style": {"color": "LightSteelBlue", "fontSize": "20px"},
+            },
+        ),
+        dcc.Graph(id=COUNTRY_MAP)
+    ])
+
+
+def update_map(selected_year):
+    country_df = imo_data.get('results')
+
+    # Filter the country_df for the selected year
+    country_df_in_year = country_df[country_df['year'] == selected_year]
+
+    # Names of the countries that participated
+    countries_participated = country_df_in_year['country'].unique().tolist()
+
+    # Use plotly.express to create the choropleth map
+    fig = px.choropleth(
+        locations=countries_participated,  # Use country names
+        locationmode='country names',  # Specify the locationmode
+        color=countries_participated, # Color countries that participated
+        color_discrete_sequence=["blue"], # Assign the color
+        scope='world',
+        title=f'Countries Participating in {selected_year}',
+        height=800,  # Increased height
+        width=1200,  # Increased width
+    )
+    return fig
+
+
+if not animated.ENABLED:
+    dash.callback(
+        Output(COUNTRY_MAP, 'figure'),
+        Input(YEAR_SLIDER, 'value')
+    )(update_map)
@@ -0,0 +1,38 @@
+# Average points per problem over time (competition_evolution.ipynb)
+import dash
+from dash import dcc, html
+import numpy as np
+import plotly.graph_objects as go
+
+import imo_data
+
+dash.register_page(__name__, path='/problem-points', name='Average points per problem', order=2)
+
+
+# The chart is static, so it is built with the layout when the page is opened
+def layout(**query_parameters):
+    timeline_df = imo_data.get('timeline')
+    tensor = imo_data.get('score_tensor')
+    problems = ['p1', 'p2', 'p3', 'p4', 'p5', 'p6']
+
+    # Points scored on each problem per year, summed over all countries, in
+    # one reduction of the score tensor; per contestant of the timeline
+    problem_points = tensor.frame(np.nan_to_num(tensor.reduce('sum', over='country', problems=problems)),
+                                  problems=problems)
+    problem_points = problem_points.div(timeline_df.set_index('year')['all_contestant'], axis=0)
+
+    fig = go.Figure()
+
+    for problem in problems:
+        fig.add_trace(go.Scatter(x=problem_points.index, y=problem_points[problem].values, mode='lines', name=f'Problem {problem.upper()}'))
+
+    fig.update_layout(
+        title_text="Average points for each problem over time",
+        xaxis_title="Year",
+        yaxis_title="Total Points"
+    )
+
+    return html.Div([
+        html.H1("Average points for each problem over time"),
+        dcc.Graph(id='problem-points-chart', figure=fig)
+    ])
@@ -0,0 +1,183 @@
+# Year x country x problem score tensor.
+#
+# Built once from the country results (team points per problem) and the
+# packed contestant arrays (contestants per team, full scores per problem),
+# so per-problem questions are NumPy reductions over a small dense array
+# instead of repeated DataFrame groupbys:
+#
+#     tensor = imo_data.get('score_tensor')
+#     tensor.reduce('sum', over='country')                 # year x problem
+#     tensor.reduce('mean', over=('year', 'country'), years=range(2000, 2025))
+#     tensor.share('country', countries=['Japan'])         # Japan's share of each problem
+#
+# Year, country and problem labels must exist in the tensor, or a KeyError
+# names the first missing one.  There was no IMO in 1980, so a year range
+# across it (e.g. range(1975, 1985)) fails; pass tensor.years[...] instead.
+#
+# A points cell is present when the country took part that year and the
+# problem was set (p7 only exists in the years with seven problems), a
+# full-score cell when a contestant of the team was scored on the problem.
+# Reductions skip absent cells, and a reduction over nothing but absent cells
+# is NaN (0 for counts).
+import numpy as np
+import pandas as pd
+
+from contestant_data import MISSING, PROBLEM_COLS
+
+AXES = ('year', 'country', 'problem')
+STATS = ('sum', 'mean', 'min', 'max', 'count')
+FULL_SCORE = 7
+
+
+# Sum over the `axis` positions of a (year, country, problem) array; einsum
+# is several times faster than ndarray.sum on this shape (a short last axis)
+def _sum(array, axis):
+    kept = ''.join(letter for i, letter in enumerate('ycp') if i not in axis)
+    return np.einsum(f'ycp->{kept}', array)
+
+
+class ScoreTensor:
+    def __init__(self, years, countries, points, present, contestants, full_scores, scored):
+        self.years = years
+        self.countries = countries
+        self.problems = list(PROBLEM_COLS)
+        # (years, countries, problems) team points, NaN where absent
+        self.points = points
+        self.present = present
+        # (years, countries) contestants per team, from the contestant file
+        self.contestants = contestants
+        # (years, countries, problems) contestants with a full score, and
+        # whether any contestant of the team was scored on the problem
+        self.full_scores = full_scores
+        self.scored = scored
+        self._year_positions = {int(year): i for i, year in enumerate(years)}
+        self._country_positions = {country: i for i, country in enumerate(countries)}
+        self._problem_positions = {problem: i for i, problem in enumerate(self.problems)}
+        # Reductions read these: values with absent cells zeroed, and masks
+        self._filled = {'points': np.where(present, points, 0.0), 'full_scores': full_scores.astype('float64')}
+        self._masks = {'points': present.astype('float64'), 'full_scores': scored.astype('float64')}
+        self._year_contestants = contestants.sum(axis=1).astype('float64')
+
+    @classmethod
+    def from_results(cls, results_df, contestants):
+        result_countries = results_df['country'].astype(str).to_numpy()
+        countries = sorted(set(result_countries) | set(contestants.countries))
+        years = np.union1d(results_df['year'].to_numpy(), contestants.year).astype('int64')
+        country_positions = {country: i for i, country in enumerate(countries)}
+        shape = (len(years), len(countries), len(PROBLEM_COLS))
+
+        # Team points: one scatter of the country rows
+        year_idx = np.searchsorted(years, results_df['year'].to_numpy())
+        country_idx = np.array([country_positions[country] for country in result_countries], dtype='int64')
+        points = np.full(shape, np.nan)
+        points[year_idx, country_idx] = results_df[PROBLEM_COLS].to_numpy(dtype='float64')
+        present = ~np.isnan(points)
+
+        # Contestants and full scores per team: bincounts over the contestant
+        # rows, keyed by flat (year, country) cell
+        country_lookup = np.array([country_positions[country] for country in contestants.countries], dtype='int64')
+        cells = (np.searchsorted(years, contestants.year) * len(countries)
+                 + country_lookup[contestants.country])
+        team_count = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape[:2])
+
+        def per_problem(weights):
+            return np.stack([
+                np.bincount(cells, weights[:, p], shape[0] * shape[1]) for p in range(len(PROBLEM_COLS))
+            ], axis=-1).reshape(shape)
+
+        full_scores = per_problem(contestants.scores == FULL_SCORE).astype('int64')
+        # Problems some contestant of the team was scored on
+        scored = per_problem(contestants.scores != MISSING) > 0
+
+        return cls(years, countries, points, present, team_count, full_scores, scored)
+
+    # Positions along each axis for the given labels (a full slice when None)
+    def _positions(self, years=None, countries=None, problems=None):
+        def lookup(labels, positions, name):
+            if labels is None:
+                return slice(None)
+            if isinstance(labels, (str, int, np.integer)):
+                labels = [labels]
+            try:
+                return np.array([positions[label] for label in labels], dtype='int64')
+            except KeyError as error:
+                raise KeyError(f'Unknown {name} {error.args[0]!r}') from None
+
+        return (
+            lookup(None if years is None else [int(year) for year in years], self._year_positions, 'year'),
+            lookup(countries, self._country_positions, 'country'),
+            lookup(problems, self._problem_positions, 'problem'),
+        )
+
+    # Values of `measure` ('points' or 'full_scores'), 0 where absent, and the
+    # presence mask as 0/1 floats; views of the whole tensor when nothing is selected
+    def select(self, measure='points', years=None, countries=None, problems=None):
+        if measure not in self._filled:
+            raise ValueError(f"Unknown measure {measure!r}; expected one of {sorted(self._filled)}")
+        values, present = self._filled[measure], self._masks[measure]
+        for axis, positions in enumerate(self._positions(years, countries, problems)):
+            if not isinstance(positions, slice):
+                values = values.take(positions, axis=axis)
+                present = present.take(positions, axis=axis)
+        return values, present
+
+    # `stat` of `measure` over one axis or a tuple of axes, skipping absent
+    # cells; the result keeps the other axes in year, country, problem order
+    def reduce(self, stat='sum', over='country', measure='points', years=None, countries=None, problems=None):
+        if stat not in STATS:
+            raise ValueError(f'Unknown stat {stat!r}; expected one of {STATS}')
+        over = (over,) if isinstance(over, str) else tuple(over)
+        unknown = set(over) - set(AXES)
+        if unknown:
+            raise KeyError(f'Unknown axes {sorted(unknown)}; available: {list(AXES)}')
+        axis = tuple(AXES.index(name) for name in over)
+
+        values, present = self.select(measure, years, countries, problems)
+        count = _sum(present, axis).astype('int64')
+        if stat == 'count':
+            return count
+        if stat == 'sum':
+            result = _sum(values, axis)
+        elif stat == 'mean':
+            result = _sum(values, axis) / np.maximum(count, 1)
+        elif stat == 'max':
+            result = np.where(present > 0, values, -np.inf).max(axis=axis)
+        else:
+            result = np.where(present > 0, values, np.inf).min(axis=axis)
+        return np.where(count > 0, result, np.nan)
+
+    # Each cell's share of the total along `along`, e.g. along='country' gives
+    # a team's share of all points scored on a problem that year
+    def share(self, along='country', measure='points', years=None, countries=None, problems=None):
+        axis = AXES.index(along)
+        selected = {'years': years, 'countries': countries, 'problems': problems}
+        own = list(selected)[axis]
+        values, present = self.select(measure, **dict(selected, **{own: None}))
+        totals = np.expand_dims(_sum(values, (axis,)), axis)
+        # Only the requested cells are divided
+        positions = self._positions(**{own: selected[own]})[axis]
+        if not isinstance(positions, slice):
+            values, present = values.take(positions, axis=axis), present.take(positions, axis=axis)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(present > 0, values / totals, np.nan)
+
+    # (years, problems) average points per contestant
+    def average_points(self, years=None, problems=None):
+        totals = self.reduce('sum', over='country', years=years, problems=problems)
+        contestants = self._year_contestants[self._positions(years=years)[0]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return totals / np.where(contestants > 0, contestants, np.nan)[:, None]
+
+    # (years, problems) share of the maximum score scored per contestant, so
+    # 0 is a problem nobody solved and 1 one everybody did
+    def difficulty(self, years=None, problems=None):
+        return 1 - self.average_points(years, problems) / FULL_SCORE
+
+    # Problems set in each year
+    def problem_counts(self):
+        return np.count_nonzero(self.present.any(axis=1), axis=1)
+
+    # DataFrame of a (years, problems) result, e.g. average_points()
+    def frame(self, values, years=None, problems=None):
+        return pd.DataFrame(values, index=pd.Index(self.years if years is None else list(years), name='year'),
+                            columns=self.problems if problems is None else list(problems))
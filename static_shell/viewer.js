@@ -0,0 +1,92 @@
+// Static viewer for the bundle written by export_static.py: the same views
+// as the Dash dashboards, read from precomputed figure JSON.
+var imoStatic = (function () {
+    var TITLES = {
+        gdp: 'GDP vs IMO Medals Analysis',
+        gdp_per_capita: 'GDP per Capita vs IMO Medals Analysis'
+    };
+
+    function load(path) {
+        return fetch(path).then(function (response) {
+            if (!response.ok) {
+                throw new Error(path + ': ' + response.status);
+            }
+            return response.json();
+        });
+    }
+
+    function fillSelect(select, options, value) {
+        select.innerHTML = '';
+        options.forEach(function (option) {
+            var element = document.createElement('option');
+            element.value = option[0];
+            element.textContent = option[1];
+            select.appendChild(element);
+        });
+        if (value !== undefined) {
+            select.value = value;
+        }
+    }
+
+    function gdp() {
+        var dashboard = new URLSearchParams(window.location.search).get('dashboard') || 'gdp';
+        var yearSelect = document.getElementById('year');
+        var countrySelect = document.getElementById('country');
+        document.getElementById('title').textContent = TITLES[dashboard] || dashboard;
+
+        load(dashboard + '/index.json').then(function (index) {
+            var slugs = {};
+
+            function showCountry() {
+                var year = yearSelect.value;
+                var country = countrySelect.value;
+                Promise.all([
+                    load(dashboard + '/year-' + year + '.json'),
+                    load(dashboard + '/' + year + '/' + slugs[country] + '.json')
+                ]).then(function (figures) {
+                    var base = figures[0];
+                    var state = figures[1];
+                    Plotly.react('scatter-plot', base.data.concat([state.highlight]), base.layout);
+                    Plotly.react('country-details', state.details.data, state.details.layout);
+                    document.getElementById('country-stats').innerHTML = state.stats;
+                });
+            }
+
+            function showYear() {
+                var countries = index.countries[yearSelect.value];
+                slugs = {};
+                countries.forEach(function (entry) {
+                    slugs[entry[0]] = entry[1];
+                });
+                fillSelect(countrySelect, countries.map(function (entry) {
+                    return [entry[0], entry[0]];
+                }));
+                showCountry();
+            }
+
+            var years = index.years.slice().reverse();
+            fillSelect(yearSelect, years.map(function (year) {
+                return [year, year];
+            }), years[0]);
+            yearSelect.addEventListener('change', showYear);
+            countrySelect.addEventListener('change', showCountry);
+            showYear();
+        });
+    }
+
+    function gender() {
+        var viewSelect = document.getElementById('view');
+        load('gender/index.json').then(function (index) {
+            function show() {
+                load('gender/' + viewSelect.value + '.json').then(function (figure) {
+                    Plotly.react('main-graph', figure.data, figure.layout);
+                });
+            }
+            fillSelect(viewSelect, index.views, index.default);
+            viewSelect.addEventListener('change', show);
+            show();
+        });
+    }
+
+    return {gdp: gdp, gender: gender};
+})();
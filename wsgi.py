@@ -0,0 +1,40 @@
+# WSGI entry point for serving the dashboards under a pre-forking server, e.g.
+#
+#     IMO_DASHBOARD=gdp gunicorn -c gunicorn.conf.py
+#
+# The default, IMO_DASHBOARD=all, serves the multi-page app (app.py) with
+# every dashboard in one process.
+#
+# The dashboard module is imported here, in the master process when the
+# server preloads the app, and every dataset it reads is loaded before the
+# workers fork, so all workers share those pages copy-on-write instead of
+# each parsing its own copy.  The Flask development server, debug mode and
+# hot reload are never started on this path.
+import importlib
+import os
+
+import imo_data
+
+# Dashboard name -> (module, datasets it reads, including lazily in callbacks)
+DASHBOARDS = {
+    'all': ('app', ['gdp_merged', 'gdp_index', 'gdp_trendlines',
+                    'gdp_per_capita_merged', 'gdp_per_capita_index', 'gdp_per_capita_trendlines',
+                    'gii_merged', 'gii_cube', 'timeline', 'results', 'contestants', 'score_tensor',
+                    'contestant_analytics']),
+    'gdp': ('gdp', ['gdp_merged', 'gdp_index', 'gdp_trendlines']),
+    'gdp_per_capita': ('gdp_per_capita',
+                       ['gdp_per_capita_merged', 'gdp_per_capita_index', 'gdp_per_capita_trendlines']),
+    'gender': ('gender', ['gii_merged', 'gii_cube', 'timeline']),
+    'contestants': ('contestants', ['contestants']),
+    'contestant_stats': ('contestant_stats', ['contestant_analytics']),
+}
+
+DASHBOARD = os.environ.get('IMO_DASHBOARD', 'all')
+if DASHBOARD not in DASHBOARDS:
+    raise KeyError(f"Unknown dashboard {DASHBOARD!r}; available: {', '.join(sorted(DASHBOARDS))}")
+
+module_name, datasets = DASHBOARDS[DASHBOARD]
+imo_data.preload(*datasets)
+
+app = importlib.import_module(module_name).create_app()
+server = app.server